@@ -167,7 +167,15 @@ class AdvancedSchedulingSolver:
         #   temporarily change CWD to solver_output when invoking
         #   testcase_gui.Solve_test_case so that its relative 'out' path
         #   is created under the expected folder.
-        
+
+    @staticmethod
+    def _shift_indices(shifts: List) -> Dict[str, List[Dict]]:
+        """Return shifts grouped by date."""
+        shifts_by_date = collections.defaultdict(list)
+        for shift in shifts:
+            shifts_by_date[shift['date']].append(shift)
+        return dict(shifts_by_date)
+
     async def solve_async(self, case_data: Dict[str, Any], run_id: str) -> Dict[str, Any]:
         """
         Asynchronous wrapper for the solver that integrates your OR-Tools logic
@@ -276,10 +284,13 @@ class AdvancedSchedulingSolver:
             }
     
     def _build_and_solve_model(self, constants: Dict, calendar: Dict, 
-                             shifts: List, providers: List, run_config: Dict, run_id: str) -> Dict[str, Any]:
+                             shifts: List, providers: List, run_config: Dict, run_id: str,
+                             shifts_by_date: Optional[Dict[str, List[Dict]]] = None) -> Dict[str, Any]:
         """
         Core optimization path. If testcase_gui.py is available locally,
         delegate solving to it; otherwise use the built-in simplified model.
+        ``shifts_by_date`` may be passed pre-built; otherwise it is built only
+        when the built-in model needs it (see ``_shift_indices``).
         """
         # Ensure there is a per-run output directory available for testcase_gui
         run_output_dir = self.output_dir / run_id
@@ -468,10 +479,9 @@ class AdvancedSchedulingSolver:
             )
         
         # Constraint 2: Provider availability and forbidden days
-        shifts_by_date = collections.defaultdict(list)
-        for shift in shifts:
-            shifts_by_date[shift['date']].append(shift)
-            
+        if shifts_by_date is None:
+            shifts_by_date = self._shift_indices(shifts)
+
         for provider in providers:
             provider_name = provider['name']
             
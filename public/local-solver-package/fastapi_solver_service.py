@@ -32,6 +32,8 @@ import traceback
 from concurrent.futures import ThreadPoolExecutor
 import threading
 import calendar as pycalendar
+import re
+from functools import lru_cache
 import shutil
 from ortools.sat.python import cp_model
 import tempfile
@@ -69,6 +71,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger("scheduler-fastapi")
 
+# Canonical YYYY-MM-DD; such entries skip the split/int/reformat path in
+# _sanitize_calendar. Compiled once at import rather than per call. ASCII
+# only, so other Unicode digits still go through int() and get reformatted.
+_CAL_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+
+
+@lru_cache(maxsize=None)
+def _month_last_day(y: int, m: int) -> int:
+    return pycalendar.monthrange(y, m)[1]
+
 app = FastAPI(
     title="Medical Staff Scheduling Solver API",
     description="High-performance optimization service for medical staff scheduling",
@@ -397,11 +409,24 @@ class AdvancedSchedulingSolver:
         if not isinstance(days, list):
             return calendar_obj
 
+        # Return new calendar object with cleaned days and preserve other keys
+        new_cal = dict(calendar_obj)
+        new_cal['days'] = self._clean_calendar_days(days)
+        return new_cal
+
+    def _clean_calendar_days(self, days: List[Any]) -> List[str]:
+        """Per-entry validation/clamping shared by the calendar sanitizers."""
         cleaned: List[str] = []
         for idx, d in enumerate(days):
             if not isinstance(d, str):
                 logger.warning(f"Non-string calendar entry at index {idx}: {d} - skipping")
                 continue
+            canonical = _CAL_DATE_RE.fullmatch(d)
+            if canonical:
+                y, m, dd = int(canonical[1]), int(canonical[2]), int(canonical[3])
+                if y >= 1 and 1 <= m <= 12 and 1 <= dd <= _month_last_day(y, m):
+                    cleaned.append(d)
+                    continue
             parts = d.split('-')
             if len(parts) != 3:
                 logger.warning(f"Invalid ISO date format in calendar at index {idx}: {d} - skipping")
@@ -414,13 +439,18 @@ class AdvancedSchedulingSolver:
                 logger.warning(f"Non-numeric ISO parts in calendar at index {idx}: {d} - skipping")
                 continue
 
+            # Years outside what datetime.date supports can never be solved
+            if y < 1 or y > 9999:
+                logger.warning(f"Year out of range in calendar at index {idx}: {d} - skipping")
+                continue
+
             # Clamp month to 1..12
             if m < 1 or m > 12:
                 logger.warning(f"Month out of range in calendar at index {idx}: {d} - skipping")
                 continue
 
             # Determine last valid day for that month/year
-            last_day = pycalendar.monthrange(y, m)[1]
+            last_day = _month_last_day(y, m)
             if dd < 1:
                 logger.warning(f"Day out of range (<1) in calendar at index {idx}: {d} - skipping")
                 continue
@@ -430,11 +460,7 @@ class AdvancedSchedulingSolver:
                 cleaned.append(corrected)
             else:
                 cleaned.append(f"{y:04d}-{m:02d}-{dd:02d}")
-
-        # Return new calendar object with cleaned days and preserve other keys
-        new_cal = dict(calendar_obj)
-        new_cal['days'] = cleaned
-        return new_cal
+        return cleaned
 
     def _ensure_shifts_in_calendar(self, calendar_obj: Dict[str, Any], shifts: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -669,6 +695,31 @@ class AdvancedSchedulingSolver:
         
         return result
 
+    def _sanitize_and_ensure(self, calendar_obj: Dict[str, Any], shifts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Same result as _ensure_shifts_in_calendar(_sanitize_calendar(calendar_obj), shifts),
+        but the days list is cleaned, checked and copied once.
+        """
+        if not calendar_obj or not isinstance(calendar_obj.get('days'), list):
+            # nothing to sanitize; only the shift-date merge applies
+            return self._ensure_shifts_in_calendar(calendar_obj, shifts)
+
+        cleaned = self._clean_calendar_days(calendar_obj['days'])
+        existing = set(cleaned)
+        missing = set()
+        for s in (shifts or []):
+            d = s.get('date') if isinstance(s, dict) else None
+            if isinstance(d, str) and d not in existing:
+                missing.add(d)
+
+        if missing:
+            logger.warning(f"Missing shift dates not present in calendar.days: {sorted(missing)} - adding to calendar")
+            cleaned = sorted(existing | missing)
+
+        new_cal = dict(calendar_obj)
+        new_cal['days'] = cleaned
+        return new_cal
+
     def _to_webapp_response(self, model_result: Dict[str, Any], run_id: str) -> Dict[str, Any]:
         """Normalize model_result into response expected by existing local solver clients."""
         # Extract solutions
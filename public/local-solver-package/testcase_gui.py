@@ -24,12 +24,17 @@ import threading
 import subprocess
 import queue
 import random
+import functools
+import copy
+import bisect
+import codecs
+import locale
 from pathlib import Path
 from datetime import date, timedelta, datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 
-import argparse, json, os, re, sys, subprocess, traceback
+import re
 import datetime as dt
 from collections import defaultdict
 from typing import Dict, Any, List
@@ -38,7 +43,8 @@ import logging
 from logging import Logger
 
 from ortools.sat.python import cp_model
-from openpyxl import Workbook
+# openpyxl is imported inside the Excel writers; it is slow to import and the
+# GUI/diagnose paths never need it
 CHOSPITAL = ""
 SCALE = 1
 #!/usr/bin/env python3
@@ -60,9 +66,11 @@ Behavior is identical to the CLI version you shared:
 Deps:
   - colorama (optional for terminal colors)
   - openpyxl (only if reading .xlsx/.xlsm)
+  - python-calamine (optional; faster .xlsx/.xlsm reading, used when installed)
 """
 
-import json, csv, sys, collections, io
+import json, csv, sys, collections, io, itertools
+from functools import lru_cache
 from pathlib import Path
 from datetime import date, datetime
 
@@ -86,30 +94,47 @@ def _c_dim(s):  return (Style.DIM + s + Style.RESET_ALL)  if _USE_COLOR else s
 
 _PREFERRED_ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
 
+try:
+    import orjson as _orjson  # optional: faster parsing of large case files
+except Exception:
+    _orjson = None
+
+_BOMS = ((b"\xef\xbb\xbf", "utf-8-sig"), (b"\xff\xfe", "utf-16"), (b"\xfe\xff", "utf-16"))
+
 def _read_text_best_effort(path: str):
+    # one read; a BOM settles the encoding, otherwise try the preferred list
+    data = Path(path).read_bytes()
+    for bom, enc in _BOMS:
+        if data.startswith(bom):
+            try:
+                return data.decode(enc), enc, False
+            except UnicodeDecodeError:
+                break
     for enc in _PREFERRED_ENCODINGS:
         try:
-            with open(path, "r", encoding=enc, newline="") as f:
-                return f.read(), enc, False
+            return data.decode(enc), enc, False
         except UnicodeDecodeError:
             continue
-    data = Path(path).read_bytes()
     txt = data.decode("latin-1", errors="replace")
     return txt, "latin-1-replace", True
 
 def _read_json_best_effort(path: str):
+    raw = Path(path).read_bytes()
+    if _orjson is not None:
+        # fast path for the common case: valid UTF-8 JSON
+        try:
+            return _orjson.loads(raw), "utf-8"
+        except _orjson.JSONDecodeError:
+            pass  # not UTF-8 or not JSON; the loop below sorts out which
     last_err = None
     for enc in _PREFERRED_ENCODINGS:
         try:
-            with open(path, "r", encoding=enc) as f:
-                return json.load(f), enc
+            text = raw.decode(enc)
         except UnicodeDecodeError as e:
             last_err = e
             continue
-        except json.JSONDecodeError:
-            raise
-    raw = Path(path).read_bytes().decode("latin-1", errors="replace")
-    return json.loads(raw), "latin-1-replace"
+        return json.loads(text), enc
+    return json.loads(raw.decode("latin-1", errors="replace")), "latin-1-replace"
 
 # -------------- Case loader --------------
 
@@ -157,84 +182,100 @@ def infer_schedule_from_json(obj):
                 out.setdefault(str(sid).strip(), []).append(str(prov).strip())
         return out
     if isinstance(obj, dict):
-        ok = True
-        for k in obj.keys():
+        # {shift_id: provider | [providers]}: one pass, bail on the first non-str key
+        out = {}
+        for k, v in obj.items():
             if not isinstance(k, str):
-                ok = False; break
-        if ok:
-            out = {}
-            for k, v in obj.items():
-                if isinstance(v, list):
-                    out[str(k).strip()] = [str(x).strip() for x in v if str(x).strip()]
-                elif isinstance(v, str):
-                    out[str(k).strip()] = [v.strip()]
-            if out:
-                return out
+                return None
+            if isinstance(v, list):
+                out[k.strip()] = [sx for sx in (str(x).strip() for x in v) if sx]
+            elif isinstance(v, str):
+                out[k.strip()] = [v.strip()]
+        if out:
+            return out
     return None
 
+_SHIFT_COLS = frozenset({"shiftid", "shift id", "id", "shift"})
+_PROV_COLS  = frozenset({"assignee", "provider", "provider_name", "name"})
+
 def _find_candidate_columns(header_lower):
-    def find_col(names):
-        for i, h in enumerate(header_lower):
-            if h in names:
-                return i
-        return None
-    c_shift = find_col({"shiftid", "shift id", "id", "shift"})
-    c_prov  = find_col({"assignee", "provider", "provider_name", "name"})
+    c_shift = next((i for i, h in enumerate(header_lower) if h in _SHIFT_COLS), None)
+    c_prov  = next((i for i, h in enumerate(header_lower) if h in _PROV_COLS), None)
     return c_shift, c_prov
 
-def _load_schedules_from_xlsx(path: str):
-    """Return list of (sheet_name, schedule_map). One entry per suitable sheet."""
-    try:
-        from openpyxl import load_workbook
-    except ImportError:
-        raise RuntimeError("openpyxl is required to read .xlsx/.xlsm files. Install via: pip install openpyxl")
-
-    wb = load_workbook(path, data_only=True, read_only=True)
-    results = []
+def _schedule_from_rows(rows):
+    """Header-sniff + ShiftID/Provider extraction for one sheet's rows (or None)."""
+    rows = iter(rows)
+    head = list(itertools.islice(rows, 10))
+    # sniff header
+    header = None
+    for row in head:
+        if not row: continue
+        nonempty = [c for c in row if c not in (None, "")]
+        if len(nonempty) < 2: continue
+        header = [str(c).strip() if c is not None else "" for c in row]
+        break
+    if not header:
+        return None
+    lower = [h.lower() for h in header]
+    c_shift, c_prov = _find_candidate_columns(lower)
+    if c_shift is None or c_prov is None:
+        return None
 
-    for ws in wb.worksheets:
-        # sniff header
-        header = None
-        for row in ws.iter_rows(max_row=10, values_only=True):
-            if not row: continue
-            nonempty = [c for c in row if c not in (None, "")]
-            if len(nonempty) < 2: continue
-            header = [str(c).strip() if c is not None else "" for c in row]
-            break
-        if not header:
+    # read rows
+    sheet_map = {}
+    for row in itertools.chain(head[1:], rows):
+        if not row:
             continue
-        lower = [h.lower() for h in header]
-        c_shift, c_prov = _find_candidate_columns(lower)
-        if c_shift is None or c_prov is None:
+        sid = row[c_shift] if c_shift < len(row) else None
+        prov = row[c_prov] if c_prov < len(row) else None
+        if sid is None or str(sid).strip() == "":
             continue
+        if prov is None or str(prov).strip() == "" or str(prov).strip().upper() == "UNFILLED":
+            continue
+        sid = str(sid).strip()
+        prov = str(prov).strip()
+        sheet_map.setdefault(sid, []).append(prov)
+    return sheet_map
 
-        # read rows
-        first = True
-        sheet_map = {}
-        for row in ws.iter_rows(values_only=True):
-            if first:
-                first = False
-                continue
-            if not row:
-                continue
-            sid = row[c_shift] if c_shift < len(row) else None
-            prov = row[c_prov] if c_prov < len(row) else None
-            if sid is None or str(sid).strip() == "":
-                continue
-            if prov is None or str(prov).strip() == "" or str(prov).strip().upper() == "UNFILLED":
-                continue
-            sid = str(sid).strip()
-            prov = str(prov).strip()
-            sheet_map.setdefault(sid, []).append(prov)
+def _calamine_cell(c):
+    # calamine reports every number as float; openpyxl gives ints for whole numbers
+    return int(c) if isinstance(c, float) and c.is_integer() else c
+
+def _load_schedules_from_xlsx(path: str):
+    """Return list of (sheet_name, schedule_map). One entry per suitable sheet."""
+    results = []
+    try:
+        # Rust-based reader; much faster than openpyxl on large sheets
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        CalamineWorkbook = None
+
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(path)
+        sheet_names = list(wb.sheet_names)
+        for name in sheet_names:
+            rows = ([_calamine_cell(c) for c in row] for row in wb.get_sheet_by_name(name).to_python())
+            sheet_map = _schedule_from_rows(rows)
+            if sheet_map:
+                results.append((name, sheet_map))
+    else:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("openpyxl is required to read .xlsx/.xlsm files. Install via: pip install openpyxl")
 
-        if sheet_map:
-            results.append((ws.title, sheet_map))
+        wb = load_workbook(path, data_only=True, read_only=True)
+        sheet_names = [ws.title for ws in wb.worksheets]
+        for ws in wb.worksheets:
+            sheet_map = _schedule_from_rows(ws.iter_rows(values_only=True))
+            if sheet_map:
+                results.append((ws.title, sheet_map))
 
     if not results:
-        sheet_names = ", ".join(ws.title for ws in wb.worksheets)
         raise ValueError(
             f"No suitable worksheets in {path}. Need headers: ShiftID & Provider/Assignee. "
-            f"Sheets present: [{sheet_names}]"
+            f"Sheets present: [{', '.join(sheet_names)}]"
         )
     return results
 
@@ -247,24 +288,26 @@ def _load_schedule_from_csv(path: str):
         class _D(csv.excel):
             delimiter = ','
         dialect = _D()
-    try:
-        has_header = csv.Sniffer().has_header(sample)
-    except Exception:
-        has_header = True
-    fobj = io.StringIO(text)
-    reader = csv.DictReader(fobj, dialect=dialect) if has_header else csv.DictReader(fobj, fieldnames=None, dialect=dialect)
+    # The first row is the header either way (as with csv.DictReader); data
+    # rows are then read by column index, without building a dict per row
+    reader = csv.reader(io.StringIO(text), dialect=dialect)
+    fieldnames = next(reader, None)
     col_shift = col_provider = None
-    if reader.fieldnames:
-        lower = [c.lower() for c in reader.fieldnames]
+    if fieldnames:
+        lower = [c.lower() for c in fieldnames]
         c_shift, c_prov = _find_candidate_columns(lower)
-        if c_shift is not None: col_shift = reader.fieldnames[c_shift]
-        if c_prov  is not None: col_provider = reader.fieldnames[c_prov]
+        if c_shift is not None: col_shift = fieldnames[c_shift]
+        if c_prov  is not None: col_provider = fieldnames[c_prov]
     if not col_shift or not col_provider:
-        raise ValueError(f"CSV must include columns for shift and provider; got fields: {reader.fieldnames} (encoding={enc})")
+        raise ValueError(f"CSV must include columns for shift and provider; got fields: {fieldnames} (encoding={enc})")
+    # a repeated header name resolves to its last column, like a DictReader row dict
+    ci_shift = len(fieldnames) - 1 - fieldnames[::-1].index(col_shift)
+    ci_prov = len(fieldnames) - 1 - fieldnames[::-1].index(col_provider)
     out = {}
     for row in reader:
-        sid = (row.get(col_shift) or "").strip()
-        prov = (row.get(col_provider) or "").strip()
+        n = len(row)
+        sid = row[ci_shift].strip() if ci_shift < n else ""
+        prov = row[ci_prov].strip() if ci_prov < n else ""
         if sid and prov and prov.upper() != "UNFILLED":
             out.setdefault(sid, []).append(prov)
     return out, enc
@@ -293,21 +336,31 @@ def load_schedules(path_str: str):
 
 # -------------- Helpers --------------
 
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 def iso_weekday_name(dstr):
-    y,m,dd = map(int, dstr.split("-"))
-    return date(y,m,dd).strftime("%A")
+    # ordinal 1 (0001-01-01) was a Monday; the ordinal is parsed once per date string
+    return _WEEKDAY_NAMES[(_day_ordinal(dstr) - 1) % 7]
 
 def _to_date(dstr: str) -> date:
-    y,m,dd = map(int, dstr.split("-"))
-    return date(y,m,dd)
+    try:
+        return date.fromisoformat(dstr)  # C parser for the usual zero-padded form
+    except ValueError:
+        y,m,dd = map(int, dstr.split("-"))
+        return date(y,m,dd)
+
+@lru_cache(maxsize=None)
+def _day_ordinal(dstr: str) -> int:
+    # providers share the same calendar, so each date string is parsed once
+    return _to_date(dstr).toordinal()
 
 def _cluster_sizes(worked_days):
     if not worked_days:
         return []
-    dd = sorted(_to_date(d) for d in set(worked_days))
+    dd = sorted(map(_day_ordinal, set(worked_days)))
     sizes = []; run = 1
-    for i in range(1, len(dd)):
-        if (dd[i] - dd[i-1]).days == 1:
+    for prev, cur in zip(dd, dd[1:]):
+        if cur - prev == 1:
             run += 1
         else:
             sizes.append(run); run = 1
@@ -320,7 +373,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
     days = case["calendar_days"]
     shifts = case["shifts"]
     providers = case["providers"]
-    weekend_names = set(case["weekend_days"] or ["Saturday","Sunday"])
 
     if banner:
         print(_c_head(banner), file=stream)
@@ -335,7 +387,15 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
     shift_date = {sid: sh["date"] for sid, sh in shifts_by_id.items()}
     # FIXED: correct dict comprehension (remove bad/duplicate line)
     shift_type = {sid: sh.get("type","") for sid, sh in shifts_by_id.items()}
-    shift_allowed_types = {sid: set(sh.get("allowed_provider_types", ["MD"])) for sid, sh in shifts_by_id.items()}
+    # shifts repeat a handful of allowed-type combos; share one frozenset per combo
+    allowed_sets = {}
+    shift_allowed_types = {}
+    for sid, sh in shifts_by_id.items():
+        key = tuple(sh.get("allowed_provider_types", ["MD"]))
+        allowed = allowed_sets.get(key)
+        if allowed is None:
+            allowed = allowed_sets[key] = frozenset(key)
+        shift_allowed_types[sid] = allowed
 
     prov_day_to_shifts = collections.defaultdict(lambda: collections.defaultdict(list))
     for sid, provs in schedule_map.items():
@@ -350,9 +410,10 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
         checks.append((name, bool(ok), details))
 
     # 1) All shifts filled exactly once
+    # walk shifts in case order: the unfilled/overfilled previews list them that way
     unfilled, overfilled = [], []
     for sid in shifts_by_id:
-        n = len(schedule_map.get(sid, []))
+        n = len(schedule_map.get(sid, ()))
         if n == 0:
             unfilled.append(sid)
         elif n > 1:
@@ -369,75 +430,66 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
     add_check("All providers exist", len(unknown_providers)==0,
               f"Unknown providers: {', '.join(unknown_providers[:5])}{'...' if len(unknown_providers)>5 else ''}")
 
-    # 4) Provider type allowed by shift
-    bad_allowed = []
+    # One pass over each provider's worked days feeds checks 4-8, 10-11 and the
+    # soft/cluster/type-count reports below (rows keep the per-provider order)
+    shift_type_map = shift_type
+    bad_allowed, bad_forbidden, multi_same_day, bad_consec, bad_pref_hard = [], [], [], [], []
+    soft_off_hits, soft_on_mismatch = [], []
+    prov_totals, prov_type_counts, prov_clusters = {}, {}, {}
     for prov, by_day in prov_day_to_shifts.items():
         p = providers_by_name.get(prov)
-        if not p: continue
-        ptype = p.get("type","MD")
+        counter = collections.Counter()
+        total = 0
+        if p:
+            ptype = p.get("type","MD")
+            forb = set(p.get("forbidden_days_hard", []))
+            pref_map = p.get("preferred_days_hard", {}) or {}
+            soft_off = set(p.get("forbidden_days_soft", []))
+            soft_on = p.get("preferred_days_soft", {}) or {}
         for d, sids in by_day.items():
+            total += len(sids)
+            counter.update(shift_type_map.get(sid, "") for sid in sids)
+            # 6) At most one shift per provider per day
+            if len(sids) > 1:
+                multi_same_day.append((prov, d, sids))
+            if not p:
+                continue
+            # 4) Provider type allowed by shift
             for sid in sids:
                 allowed = shift_allowed_types.get(sid) or set()
                 if allowed and ptype not in allowed:
                     bad_allowed.append((prov, sid, ptype, sorted(allowed)))
-    add_check("Provider type allowed for each assigned shift", len(bad_allowed)==0, f"Violations: {len(bad_allowed)}")
-
-    # 5) Forbidden (hard-off) days
-    bad_forbidden = []
-    for prov, by_day in prov_day_to_shifts.items():
-        p = providers_by_name.get(prov)
-        if not p: continue
-        forb = set(p.get("forbidden_days_hard", []))
-        for d in by_day:
+            # 5) Forbidden (hard-off) days
             if d in forb:
-                bad_forbidden.append((prov, d, by_day[d]))
-    add_check("Providers NOT scheduled on forbidden (hard-off) days", len(bad_forbidden)==0, f"Violations: {len(bad_forbidden)}")
+                bad_forbidden.append((prov, d, sids))
+            # 8) Preferred-days HARD respected when working
+            prefs = set(pref_map.get(d, []))
+            if prefs:
+                for sid in sids:
+                    t = shift_type_map.get(sid, "")
+                    if t not in prefs:
+                        bad_pref_hard.append((prov, d, sid, t, sorted(prefs)))
+            # soft-preference diagnostics (informational)
+            if d in soft_off:
+                soft_off_hits.append((prov, d, sids))
+            prefs = set(soft_on.get(d, []))
+            if prefs and not any(shift_type_map.get(sid, "") in prefs for sid in sids):
+                soft_on_mismatch.append((prov, d, [shift_type_map.get(sid, "") for sid in sids], sorted(prefs)))
+        prov_totals[prov] = total
+        prov_type_counts[prov] = counter
+        # worked days are unique per provider, so the longest run is the largest cluster
+        sizes = prov_clusters[prov] = _cluster_sizes(by_day.keys())
+        # 7) Max consecutive days
+        K = p.get("max_consecutive_days", None) if p else None
+        if isinstance(K, int) and K > 0:
+            longest = max(sizes, default=0)
+            if longest > K:
+                bad_consec.append((prov, longest, K))
 
-    # 6) At most one shift per provider per day
-    multi_same_day = []
-    for prov, by_day in prov_day_to_shifts.items():
-        for d, sids in by_day.items():
-            if len(sids) > 1:
-                multi_same_day.append((prov, d, sids))
+    add_check("Provider type allowed for each assigned shift", len(bad_allowed)==0, f"Violations: {len(bad_allowed)}")
+    add_check("Providers NOT scheduled on forbidden (hard-off) days", len(bad_forbidden)==0, f"Violations: {len(bad_forbidden)}")
     add_check("At most one shift per provider per day", len(multi_same_day)==0, f"Violations: {len(multi_same_day)}")
-
-    # 7) Max consecutive days
-    bad_consec = []
-    for prov, by_day in prov_day_to_shifts.items():
-        p = providers_by_name.get(prov)
-        if not p: continue
-        K = p.get("max_consecutive_days", None)
-        if not (isinstance(K, int) and K > 0):
-            continue
-        worked_dates = sorted(map(lambda s: _to_date(s), by_day.keys()))
-        longest = 0; cur = 0; prev = None
-        for dt in worked_dates:
-            if prev is None or (dt - prev).days == 1:
-                cur += 1
-            else:
-                longest = max(longest, cur)
-                cur = 1
-            prev = dt
-        longest = max(longest, cur)
-        if longest > K:
-            bad_consec.append((prov, longest, K))
     add_check("Max consecutive working days respected", len(bad_consec)==0, f"Violations: {len(bad_consec)}")
-
-    # 8) Preferred-days HARD respected when working
-    shift_type_map = {sid: sh.get("type","") for sid, sh in shifts_by_id.items()}
-    bad_pref_hard = []
-    for prov, by_day in prov_day_to_shifts.items():
-        p = providers_by_name.get(prov)
-        if not p: continue
-        pref_map = p.get("preferred_days_hard", {}) or {}
-        for d, sids in by_day.items():
-            prefs = set(pref_map.get(d, []))
-            if not prefs:
-                continue
-            for sid in sids:
-                t = shift_type_map.get(sid, "")
-                if t not in prefs:
-                    bad_pref_hard.append((prov, d, sid, t, sorted(prefs)))
     add_check("Preferred-days HARD respected when working", len(bad_pref_hard)==0, f"Violations: {len(bad_pref_hard)}")
 
     # 9) Required-days HARD satisfied
@@ -457,7 +509,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     # 10) Min/Max total shifts per provider (hard)
     minmax_viol = []
-    prov_totals = {prov: sum(len(v) for v in by_day.values()) for prov, by_day in prov_day_to_shifts.items()}
     for prov in providers_by_name:
         total = prov_totals.get(prov, 0)
         lim = providers_by_name[prov].get("limits", {}) or {}
@@ -471,13 +522,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     # 11) Per-type min/max ranges (hard)
     type_range_viol = []
-    prov_type_counts = {}
-    for prov, by_day in prov_day_to_shifts.items():
-        counter = collections.Counter()
-        for d, sids in by_day.items():
-            for sid in sids:
-                counter[shift_type_map.get(sid, "")] += 1
-        prov_type_counts[prov] = counter
     for prov in providers_by_name:
         lim = providers_by_name[prov].get("limits", {}) or {}
         tr = lim.get("type_ranges", {}) or {}
@@ -522,19 +566,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     # Soft-preference diagnostics (informational)
     print(_c_head("\n=== Soft-Preference Diagnostics (informational) ==="), file=stream)
-    soft_off_hits = []
-    soft_on_mismatch = []
-    for prov, by_day in prov_day_to_shifts.items():
-        p = providers_by_name.get(prov)
-        if not p: continue
-        soft_off = set(p.get("forbidden_days_soft", []))
-        soft_on = p.get("preferred_days_soft", {}) or {}
-        for d, sids in by_day.items():
-            if d in soft_off:
-                soft_off_hits.append((prov, d, sids))
-            prefs = set(soft_on.get(d, []))
-            if prefs and not any(shift_type_map.get(sid, "") in prefs for sid in sids):
-                soft_on_mismatch.append((prov, d, [shift_type_map.get(sid, "") for sid in sids], sorted(prefs)))
     print(f"Worked on soft-off days: {len(soft_off_hits)}", file=stream)
     if soft_off_hits:
         for r in soft_off_hits[:preview_limit]:
@@ -550,9 +581,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     # Cluster analysis
     print(_c_head("\n=== Cluster Analysis ==="), file=stream)
-    prov_clusters = {}
-    for prov, by_day in prov_day_to_shifts.items():
-        prov_clusters[prov] = _cluster_sizes(by_day.keys())
     ranked = sorted(prov_clusters.items(), key=lambda kv: (len(kv[1]), sum(kv[1])), reverse=True)
     print("Providers ranked by number of clusters (then total worked days):", file=stream)
     for prov, sizes in ranked:
@@ -560,7 +588,7 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     # Imbalances
     print(_c_head("\n=== Imbalances ==="), file=stream)
-    shifts_per_provider = {prov: sum(len(v) for v in by_day.values()) for prov, by_day in prov_day_to_shifts.items()}
+    shifts_per_provider = dict(prov_totals)
     for name in providers_by_name:
         shifts_per_provider.setdefault(name, 0)
     total_assign = sum(shifts_per_provider.values())
@@ -580,13 +608,7 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
 
     print("\nPer-provider counts by shift TYPE (nonzero only):", file=stream)
     all_types = sorted({t for t in (sh.get("type","") for sh in case["shifts"]) if t})
-    prov_type_counts = {prov: collections.Counter() for prov in {p["name"] for p in case["providers"]}}
-    for prov, by_day in prov_day_to_shifts.items():
-        counter = collections.Counter()
-        for d, sids in by_day.items():
-            for sid in sids:
-                counter[shift_type_map.get(sid, "")] += 1
-        prov_type_counts[prov] = counter
+    prov_type_counts = {prov: collections.Counter() for prov in {p["name"] for p in case["providers"]}} | prov_type_counts
     for prov in sorted(prov_type_counts.keys()):
         c = prov_type_counts.get(prov, collections.Counter())
         parts = [f"{t}:{c[t]}" for t in all_types if c[t] > 0]
@@ -657,7 +679,8 @@ def run_diag(case: str, schedule: str, *, no_color: bool = False, preview: int =
             # force plain text (no ANSI) inside files
             use_color_prev = _USE_COLOR
             _USE_COLOR = False
-            with open(out_file, "w", encoding="utf-8") as f:
+            # 1 MiB buffer: a whole sheet report goes out in one or two writes
+            with open(out_file, "w", encoding="utf-8", buffering=1 << 20) as f:
                 banner = f"=== DIAGNOSE: Sheet '{label}' from {sched_path.name} ==="
                 f.write(f"{banner}\nGenerated: {ts}\n\n")
                 diagnose(case_obj, sched_map, stream=f, preview_limit=preview)
@@ -701,6 +724,8 @@ class _StreamToLogger:
 # ----------------------------- Logging helpers -----------------------------
 # Drop-in GUI logging handler that is thread-safe via a Queue + periodic drain.
 
+GUI_LOG_QUEUE_MAX = 4096  # bound on undrained GUI log lines; oldest are dropped past this
+
 class TkQueueHandler(logging.Handler):
     """Enqueue log records; GUI drains them on the Tk main thread."""
     def __init__(self, gui):
@@ -711,7 +736,18 @@ class TkQueueHandler(logging.Handler):
         try:
             msg = self.format(record)
             # Never touch Tk here (this may run on worker threads).
-            self.gui._log_queue.put(msg)
+            q = self.gui._log_queue
+            while True:
+                try:
+                    q.put_nowait(msg)
+                    break
+                except queue.Full:
+                    # backpressure: make room by dropping the oldest line
+                    try:
+                        q.get_nowait()
+                        self.gui._log_dropped += 1
+                    except queue.Empty:
+                        pass
         except Exception:
             pass
 
@@ -984,8 +1020,6 @@ def load_inputs(constants_path: str, case_path: str):
     case['calendar'].setdefault('weekend_days', consts.get('calendar', {}).get('weekend_days', ['Saturday','Sunday']))
     return consts, case
 
-from ortools.sat.python import cp_model
-
 def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     logger = logging.getLogger("scheduler")
 
@@ -1669,6 +1703,7 @@ def solve_two_phase(consts, case, ctx, K, seed=None):
     return tables, meta
 
 def write_excel_grid_multi(path, tables):
+    from openpyxl import Workbook
     wb=Workbook(); wb.remove(wb.active)
     for idx, table in enumerate(tables, start=1):
         days=table['days']; providers=table['providers']; shifts=table['shifts']; assign=set(table['assignment'])
@@ -1690,6 +1725,7 @@ def write_excel_grid_multi(path, tables):
     wb.save(path)
 
 def write_excel_hospital_multi(path, tables):
+    from openpyxl import Workbook
     wb=Workbook(); wb.remove(wb.active)
     for idx, table in enumerate(tables, start=1):
         days=table['days']; providers=table['providers']; shifts=table['shifts']; assign=set(table['assignment'])
@@ -2030,6 +2066,13 @@ DEFAULT_CASE = {
     "providers": []
 }
 
+# defaults filled into loaded cases by TestcaseGUI._normalize_loaded_case
+_DEFAULTS_SOLVER = DEFAULT_CONSTANTS["solver"]
+_DEFAULTS_SOFT = DEFAULT_CONSTANTS["weights"]["soft"]
+_DEFAULTS_OBJECTIVE = DEFAULT_CONSTANTS["objective"]
+_LOADED_HARD_DEFAULTS = dict.fromkeys(
+    ("slack_unfilled", "slack_shift_less", "slack_shift_more", "slack_cant_work", "slack_consec"), 1)
+
 WEEKDAY_NAMES = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
 CANON_PROVIDER_TYPES = ["MD","DO","RN","NP","PA"]  # used by perturb tool
 HARD_INF_WEIGHT = 1_000_000_000
@@ -2041,6 +2084,10 @@ ON_FIXED_BG   = "#c8e6c9"  # light green
 ON_PREFER_BG  = "#bbdefb"  # light blue
 
 # ---------- helpers ----------
+_HHMM_RE = re.compile(r"\A(?:[01]\d|2[0-3]):[0-5]\d\Z")  # 24h "HH:MM"
+_REQUIRED_SHIFT_KEYS = ("id", "type", "start", "end", "allowed_provider_types")
+_REQUIRED_SHIFT_KEY_SET = frozenset(_REQUIRED_SHIFT_KEYS)
+
 def month_days(year:int, month:int):
     d = date(year, month, 1)
     res = []
@@ -2048,17 +2095,25 @@ def month_days(year:int, month:int):
         res.append(d.isoformat()); d += timedelta(days=1)
     return res
 
+@functools.lru_cache(maxsize=4096)
 def iso_dt(date_str, hhmm="08:00"):
     # store seconds as :00 internally; UI shows HH:MM
     if "T" in date_str:
         return date_str
     if len(hhmm) == 5:
-        hhmm = hhmm + ":00"
+        return f"{date_str}T{hhmm}:00"
     return f"{date_str}T{hhmm}"
+
+@functools.lru_cache(maxsize=1024)
 def _next_day(date_str: str) -> str:
-    y, m, d = map(int, date_str.split("-"))
-    return (date(y, m, d) + timedelta(days=1)).isoformat()
+    try:
+        d = date.fromisoformat(date_str)  # C parser for the usual zero-padded form
+    except ValueError:
+        y, m, dd = map(int, date_str.split("-"))  # e.g. non-padded "2025-1-5"
+        d = date(y, m, dd)
+    return (d + timedelta(days=1)).isoformat()
 
+@functools.lru_cache(maxsize=4096)
 def iso_dt_end(start_date: str, start_hm: str, end_hm: str) -> str:
     """
     Build an ISO datetime for the END. If end_hm < start_hm, roll to next day.
@@ -2083,6 +2138,34 @@ def _normalize_overnight_shifts(shifts_list):
             # ignore malformed datetimes; UI edits will fix future ones
             pass
 
+def _hhmm_of(ts: str) -> str:
+    return ts.split("T")[1][:5] if "T" in ts else ts[:5]
+
+def _cache_shift_view(sh):
+    """Store the HH:MM / allowed-types values the GUI reads back on the shift itself."""
+    sh["_start_hm"] = _hhmm_of(sh.get("start", ""))
+    sh["_end_hm"] = _hhmm_of(sh.get("end", ""))
+    sh["_allowed_str"] = ",".join(sh.get("allowed_provider_types", []))
+    sh["_allowed_set"] = frozenset(sh.get("allowed_provider_types", ["MD"]))
+
+def _serialize_case(case_dict):
+    """
+    JSON-ready shallow copy of the in-memory case: drops the UI-only '_' keys on
+    shifts and turns the providers' forbidden-day sets back into sorted lists.
+    """
+    out = dict(case_dict)
+    out["shifts"] = [{k: v for k, v in sh.items() if not k.startswith("_")}
+                     for sh in case_dict.get("shifts", [])]
+    provs = []
+    for p in case_dict.get("providers", []):
+        p = dict(p)
+        for key in ("forbidden_days_hard", "forbidden_days_soft"):
+            if isinstance(p.get(key), set):
+                p[key] = sorted(p[key])
+        provs.append(p)
+    out["providers"] = provs
+    return out
+
 def unique_id(base, date_str, existing):
     cand = base if base not in existing else f"{base}@{date_str}"
     if cand not in existing: return cand
@@ -2099,6 +2182,10 @@ def _parse_int_default(s, default):
     except Exception:
         return default
 
+def _as_int(v, default):
+    # ints are already what _parse_int_default would return; skip the str() round-trip
+    return v if type(v) is int else _parse_int_default(v, default)
+
 def _sanitize_provider_identity_defaults(p):
     """Force identity defaults and remove nulls in provider constraints."""
     # max_consecutive_days
@@ -2108,9 +2195,8 @@ def _sanitize_provider_identity_defaults(p):
 
     # limits
     lim = p.setdefault("limits", {})
-    lim["min_total"] = _parse_int_default(lim.get("min_total", 0), 0)
-    mt = lim.get("max_total", IDENTITY_MAX)
-    lim["max_total"] = _parse_int_default(mt, IDENTITY_MAX)
+    lim["min_total"] = _as_int(lim.get("min_total", 0), 0)
+    lim["max_total"] = _as_int(lim.get("max_total", IDENTITY_MAX), IDENTITY_MAX)
 
     # type_ranges: ensure no nulls, coerce
     tr = lim.get("type_ranges", {})
@@ -2120,16 +2206,19 @@ def _sanitize_provider_identity_defaults(p):
     for t, rng in tr.items():
         mn, mx = 0, IDENTITY_MAX
         if isinstance(rng, (list, tuple)) and len(rng) == 2:
-            mn = _parse_int_default(rng[0], 0)
-            mx = _parse_int_default(rng[1], IDENTITY_MAX)
+            mn = _as_int(rng[0], 0)
+            mx = _as_int(rng[1], IDENTITY_MAX)
         fixed_tr[str(t)] = [mn, mx]
     lim["type_ranges"] = fixed_tr
 
-    # Ensure list/dict fields aren't null
-    p["forbidden_days_hard"] = list(p.get("forbidden_days_hard") or [])
-    p["forbidden_days_soft"] = list(p.get("forbidden_days_soft") or [])
-    p["preferred_days_hard"] = dict(p.get("preferred_days_hard") or {})
-    p["preferred_days_soft"] = dict(p.get("preferred_days_soft") or {})
+    # Ensure list/dict fields aren't null; OFF days are kept as sets while editing.
+    # Already-clean values are left in place, so re-sanitizing costs no copies.
+    for key in ("forbidden_days_hard", "forbidden_days_soft"):
+        if not isinstance(p.get(key), set):
+            p[key] = set(p.get(key) or ())
+    for key in ("preferred_days_hard", "preferred_days_soft"):
+        if type(p.get(key)) is not dict:
+            p[key] = dict(p.get(key) or {})
 
 def _sanitize_case_no_nulls(case_dict):
     """Apply identity defaults & remove nulls for constraint-like fields."""
@@ -2143,10 +2232,11 @@ class TestcaseGUI:
         self.root = root
         self.root.title("Scheduler Testcase Builder")
 
-        self._log_queue = queue.Queue()
+        self._log_queue = queue.Queue(maxsize=GUI_LOG_QUEUE_MAX)
+        self._log_dropped = 0
         self._start_gui_log_pump()
 
-        self.case = json.loads(json.dumps(DEFAULT_CASE))  # deep copy
+        self.case = copy.deepcopy(DEFAULT_CASE)
         # default out folder = current datetime
         self.case["run"]["out"] = now_out_name()
         self.current_path = None
@@ -2160,9 +2250,46 @@ class TestcaseGUI:
         self._bg_off_default = None
         self._bg_on_default = None
 
+        # day list each day-listbox currently holds (see _fill_day_listbox)
+        self._listbox_days = {}
+        # selected row values of listboxes registered with _track_selection,
+        # kept current by <<ListboxSelect>> and reset whenever they are refilled
+        self._listbox_selection = {}
+        # non-default row colors each day-listbox currently shows: {row: bg}
+        self._day_colors = {}
+
+        # deferred UI refreshes, coalesced into one after_idle flush
+        self._pending_ui = set()
+        self._ui_flush_armed = False
+
+        # While editing, shifts live in _shift_by_id (id -> shift, in case order);
+        # self.case["shifts"] is only rebuilt from it by _sync_case_shifts.
+        self._shift_by_id = {}
+        # secondary lookups (rebuilt by _reindex_shifts)
+        self._shifts_by_date = {}
+        self._shifts_by_type = {}
+        self._shifts_by_base = {}  # id before any "@date" suffix -> shifts
+        # date -> [(provider, "preferred_days_hard"|"preferred_days_soft")] holding that date
+        self._pref_index_by_date = {}
+        # what refresh_shift_table last put in the Treeview: iid -> row values,
+        # rendered for _last_shift_render_key = (date, _shifts_version)
+        self._last_rendered_shift_rows = {}
+        self._shifts_version = 0
+        # (date, provider type) -> allowed shift types, valid for _allowed_types_cache_version
+        self._allowed_types_cache = {}
+        self._allowed_types_cache_version = -1
+        # sorted tuple of shift types, valid for _shift_types_cache_version
+        self._shift_types_cache = ()
+        self._shift_types_cache_version = -1
+        self._last_shift_render_key = None
+        # Text widget -> (snapshot of the dict last shown, its pretty-printed JSON)
+        self._json_editor_cache = {}
+
         self._build_menu()
         self._build_tabs()
         self.try_autoload()
+        # render synchronously here; an autoload's deferred "all" would repeat it
+        self._pending_ui.discard("all")
         self.refresh_all(select_first=True)
 
     # ---------- Menus ----------
@@ -2214,6 +2341,7 @@ class TestcaseGUI:
         nb.add(self.tab_prov, text="Providers")
         nb.add(self.tab_cfg, text="Config")
         nb.pack(fill="both", expand=True)
+        nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         self._build_tab_run(self.tab_run)
         self._build_tab_calendar(self.tab_cal)
         self._build_tab_shifts(self.tab_shifts)
@@ -2226,21 +2354,21 @@ class TestcaseGUI:
         box.pack(fill="x", padx=8, pady=8)
 
         ttk.Label(box, text="Output folder name").grid(row=0, column=0, sticky="w", padx=6, pady=3)
-        self.ent_out = ttk.Entry(box, width=30)
+        self.var_out = tk.StringVar(); self.ent_out = ttk.Entry(box, width=30, textvariable=self.var_out)
         self.ent_out.grid(row=0, column=1, sticky="w", padx=6, pady=3)
         ttk.Button(box, text="Open Output Folder…", command=self.open_out_folder).grid(row=0, column=2, padx=6)
 
         ttk.Label(box, text="k").grid(row=1, column=0, sticky="w", padx=6, pady=3)
-        self.ent_r_k = ttk.Entry(box, width=8); self.ent_r_k.grid(row=1, column=1, sticky="w")
+        self.var_r_k = tk.StringVar(); self.ent_r_k = ttk.Entry(box, width=8, textvariable=self.var_r_k); self.ent_r_k.grid(row=1, column=1, sticky="w")
 
         # L (variety / min Hamming distance)
         ttk.Label(box, text="L (variety)").grid(row=2, column=0, sticky="w", padx=6, pady=3)
-        self.ent_r_L = ttk.Entry(box, width=8); self.ent_r_L.grid(row=2, column=1, sticky="w")
+        self.var_r_L = tk.StringVar(); self.ent_r_L = ttk.Entry(box, width=8, textvariable=self.var_r_L); self.ent_r_L.grid(row=2, column=1, sticky="w")
 
         ttk.Label(box, text="seed").grid(row=3, column=0, sticky="w", padx=6, pady=3)
-        self.ent_r_seed = ttk.Entry(box, width=10); self.ent_r_seed.grid(row=3, column=1, sticky="w")
+        self.var_r_seed = tk.StringVar(); self.ent_r_seed = ttk.Entry(box, width=10, textvariable=self.var_r_seed); self.ent_r_seed.grid(row=3, column=1, sticky="w")
         ttk.Label(box, text="time (min)").grid(row=4, column=0, sticky="w", padx=6, pady=3)
-        self.ent_r_time = ttk.Entry(box, width=10); self.ent_r_time.grid(row=4, column=1, sticky="w")
+        self.var_r_time = tk.StringVar(); self.ent_r_time = ttk.Entry(box, width=10, textvariable=self.var_r_time); self.ent_r_time.grid(row=4, column=1, sticky="w")
 
         runbtns = ttk.Frame(frame); runbtns.pack(fill="x", padx=8, pady=(0,8))
         self.btn_run = ttk.Button(runbtns, text="Run Solver", command=self.run_solver)
@@ -2288,17 +2416,24 @@ class TestcaseGUI:
             if not (1 <= m <= 12): raise ValueError()
         except Exception:
             messagebox.showerror("Invalid", "Enter valid Year and Month (1-12)."); return
-        old_days = set(self.case["calendar"]["days"])
         new_days = month_days(y, m)
         self.case["calendar"]["days"] = new_days
+        # Every preference outside the new month goes, including dates that
+        # were never in the old calendar
         new_set = set(new_days)
         for p in self.case.get("providers", []):
             for key in ("preferred_days_hard", "preferred_days_soft"):
-                if isinstance(p.get(key), dict):
-                    p[key] = {d: v for d, v in p[key].items() if d in new_set}
+                mp = p.get(key)
+                if isinstance(mp, dict):
+                    for d in [d for d in mp if d not in new_set]:
+                        del mp[d]
             for key in ("forbidden_days_hard", "forbidden_days_soft"):
-                if isinstance(p.get(key), list):
-                    p[key] = [d for d in p[key] if d in new_set]
+                v = p.get(key)
+                if isinstance(v, set):
+                    v.intersection_update(new_set)
+                elif isinstance(v, list) and not new_set.issuperset(v):
+                    # rebuilt only when something actually falls outside
+                    p[key] = [d for d in v if d in new_set]
         self._log(f"[calendar] generated {len(new_days)} days, cleared stale preferences.")
         self.refresh_all(select_first=True)
 
@@ -2306,10 +2441,26 @@ class TestcaseGUI:
         selected = [name for name,var in self.weekend_vars.items() if var.get()] or ["Saturday","Sunday"]
         self.case["calendar"]["weekend_days"] = selected
 
+    def _fill_day_listbox(self, lst):
+        """
+        Show the calendar days in `lst`. Tk only draws the visible rows, so the
+        cost is the insert traffic: skip it when the listbox already holds
+        the same days and just clear the selection, as a refill would.
+        """
+        days = self.case["calendar"]["days"]
+        self._reset_tracked_selection(lst)  # both paths below clear the selection
+        shown = self._listbox_days.get(lst)
+        if shown is not None and (shown is days or shown == days):
+            lst.selection_clear(0, tk.END)
+            return
+        lst.delete(0, tk.END)
+        if days:
+            lst.insert(tk.END, *days)
+        self._listbox_days[lst] = list(days)
+        self._day_colors[lst] = {}  # fresh rows come back in the default color
+
     def refresh_days_cal(self):
-        self.lst_days_cal.delete(0, tk.END)
-        for d in self.case["calendar"]["days"]:
-            self.lst_days_cal.insert(tk.END, d)
+        self._fill_day_listbox(self.lst_days_cal)
 
     # ---------- Shifts Tab ----------
     def _build_tab_shifts(self, frame):
@@ -2370,49 +2521,100 @@ class TestcaseGUI:
     def on_shift_date_select(self, event=None):
         self.refresh_shift_table()
 
+    def _adopt_case_shifts(self):
+        """Take ownership of self.case["shifts"] after a load/new; duplicate ids get a unique suffix."""
+        by_id = {}
+        for sh in self.case["shifts"]:
+            sid = sh.get("id", "")
+            if sid in by_id:
+                new_sid = unique_id(sid.split("@", 1)[0], sh.get("date", ""), by_id)
+                self._log(f"[shifts] duplicate id '{sid}' renamed to '{new_sid}'.", warn=True)
+                sh["id"] = sid = new_sid
+            by_id[sid] = sh
+        self._shift_by_id = by_id
+
+    def _sync_case_shifts(self):
+        """Write the edited shifts back to self.case["shifts"] (before save/run/validate/perturb)."""
+        self.case["shifts"] = list(self._shift_by_id.values())
+
+    def _reindex_shifts(self):
+        """Rebuild the date/type/base-id lookups over the shifts in _shift_by_id."""
+        by_date = {}
+        by_type = {}
+        by_base = {}
+        for sid, sh in self._shift_by_id.items():
+            _cache_shift_view(sh)
+            by_date.setdefault(sh.get("date"), []).append(sh)
+            by_type.setdefault(sh.get("type"), []).append(sh)
+            by_base.setdefault(sid.split("@", 1)[0], []).append(sh)
+        self._shifts_by_date = by_date
+        self._shifts_by_type = by_type
+        self._shifts_by_base = by_base
+        self._shifts_version += 1
+
+    def _reindex_prefs(self):
+        """Rebuild the date -> (provider, pref key) index over the ON preference maps."""
+        by_date = {}
+        for p in self.case.get("providers", []):
+            for key in ("preferred_days_hard", "preferred_days_soft"):
+                for d in (p.get(key) or {}):
+                    by_date.setdefault(d, []).append((p, key))
+        self._pref_index_by_date = by_date
+
+    def all_shift_types(self):
+        """Sorted tuple of the shift types in use (cached per shifts version)."""
+        if self._shift_types_cache_version != self._shifts_version:
+            # empty type buckets are dropped on edit, so the keys are exactly the live types
+            self._shift_types_cache = tuple(sorted(t for t in self._shifts_by_type if t))
+            self._shift_types_cache_version = self._shifts_version
+        return self._shift_types_cache
+
     def shifts_for_date(self, date_str):
-        return [sh for sh in self.case["shifts"] if sh.get("date")==date_str]
+        return self._shifts_by_date.get(date_str, ())
 
     def refresh_shift_table(self):
+        """Sync the Treeview with the selected date, touching only rows that changed."""
         sel = self.lst_dates_shifts.curselection()
         if not sel and self.case["calendar"]["days"]:
             self.lst_dates_shifts.selection_set(0)
             sel = (0,)
-        for r in self.tree_shifts.get_children():
-            self.tree_shifts.delete(r)
-        if not sel: return
-        d = self.lst_dates_shifts.get(sel[0])
-        for sh in self.shifts_for_date(d):
-            self.tree_shifts.insert("", "end", iid=sh["id"], values=(
-                sh.get("id",""), sh.get("type",""),
-                (sh.get("start","").split("T")[1][:5] if "T" in sh.get("start","") else sh.get("start","")[:5]),
-                (sh.get("end","").split("T")[1][:5] if "T" in sh.get("end","") else sh.get("end","")[:5]),
-                ",".join(sh.get("allowed_provider_types", []))
-            ))
+        d = self.lst_dates_shifts.get(sel[0]) if sel else None
+        key = (d, self._shifts_version)
+        if key == self._last_shift_render_key:
+            return
+        day_shifts = self.shifts_for_date(d) if sel else ()
+        prev = self._last_rendered_shift_rows
+
+        tree = self.tree_shifts
+        rows = {sh["id"]: (sh.get("id",""), sh.get("type",""),
+                           sh["_start_hm"], sh["_end_hm"], sh["_allowed_str"])
+                for sh in day_shifts}
+        stale = [iid for iid in prev if iid not in rows]
+        if stale:
+            tree.delete(*stale)
+        for idx, (iid, values) in enumerate(rows.items()):
+            old = prev.get(iid)
+            if old is None:
+                tree.insert("", idx, iid=iid, values=values)
+            elif old != values:
+                tree.item(iid, values=values)
+        self._last_rendered_shift_rows = rows
+        self._last_shift_render_key = key
 
     def on_shift_row_select(self, event=None):
         sel = self.tree_shifts.selection()
         if not sel: return
         iid = sel[0]
-        sh = next((x for x in self.case["shifts"] if x.get("id")==iid), None)
+        sh = self._shift_by_id.get(iid)
         if not sh: return
         self.ent_shift_id.delete(0, tk.END); self.ent_shift_id.insert(0, sh.get("id","").split("@")[0])
         self.ent_shift_type.delete(0, tk.END); self.ent_shift_type.insert(0, sh.get("type",""))
-        st = sh.get("start",""); en = sh.get("end","")
-        st = st.split("T")[1][:5] if "T" in st else st[:5]
-        en = en.split("T")[1][:5] if "T" in en else en[:5]
-        self.ent_shift_start.delete(0, tk.END); self.ent_shift_start.insert(0, st or "08:00")
-        self.ent_shift_end.delete(0, tk.END); self.ent_shift_end.insert(0, en or "16:00")
-        self.ent_allowed_types.delete(0, tk.END); self.ent_allowed_types.insert(0, ",".join(sh.get("allowed_provider_types", [])))
+        self.ent_shift_start.delete(0, tk.END); self.ent_shift_start.insert(0, sh["_start_hm"] or "08:00")
+        self.ent_shift_end.delete(0, tk.END); self.ent_shift_end.insert(0, sh["_end_hm"] or "16:00")
+        self.ent_allowed_types.delete(0, tk.END); self.ent_allowed_types.insert(0, sh["_allowed_str"])
 
     def _validate_hhmm(self, s):
-        try:
-            if len(s) == 5 and s[2] == ":":
-                h = int(s[:2]); m = int(s[3:])
-                return 0 <= h < 24 and 0 <= m < 60
-        except Exception:
-            return False
-        return False
+        return _HHMM_RE.match(s) is not None
 
     def add_shift(self):
         base_id = self.ent_shift_id.get().strip()
@@ -2432,36 +2634,49 @@ class TestcaseGUI:
             idx = self.lst_dates_shifts.curselection()[0]; dates = [self.lst_dates_shifts.get(idx)]
 
         sh_type = self.ent_shift_type.get().strip() or base_id
-        for d in dates:
-            for sh in self.shifts_for_date(d):
-                if sh.get("type","") == sh_type:
+        taken = {sh.get("date") for sh in self._shifts_by_type.get(sh_type, ())}
+        if taken:
+            for d in dates:
+                if d in taken:
                     messagebox.showerror("Duplicate type", f"Type '{sh_type}' already exists on {d}."); return
 
         if en_hm < st_hm:
             self._log(f"[shifts] '{base_id}' ends after midnight (end < start). Marked as cross-day.")
 
-        existing = {s.get("id","") for s in self.case["shifts"]}
         for d in dates:
-            sid = unique_id(base_id, d, existing); existing.add(sid)
-            self.case["shifts"].append({
+            sid = unique_id(base_id, d, self._shift_by_id)
+            sh = {
                 "id": sid, "date": d, "type": sh_type,
                 "start": iso_dt(d, st_hm), "end": iso_dt(d, en_hm),
                 "allowed_provider_types": allowed
-            })
-        self.refresh_shift_table()
+            }
+            _cache_shift_view(sh)
+            self._shifts_by_date.setdefault(d, []).append(sh)
+            self._shift_by_id[sid] = sh
+            self._shifts_by_type.setdefault(sh_type, []).append(sh)
+            self._shifts_by_base.setdefault(sid.split("@", 1)[0], []).append(sh)
+        self._shifts_version += 1
+        self._schedule_ui("shifts")
         self._log(f"[shifts] added {len(dates)} shift(s) of type {sh_type}.")
     def _start_gui_log_pump(self):
-        """Drain the log queue at ~30 FPS; only place that touches Tk Text."""
+        """Drain the log queue (~30 FPS while busy, 10 Hz when idle); only place that touches Tk Text."""
+        # bound per tick so UI stays snappy, but catch up faster when backed up
+        cap = max(500, self._log_queue.qsize())
         drained = 0
         try:
-            while drained < 500:  # bound per tick so UI stays snappy
+            while drained < cap:
                 msg = self._log_queue.get_nowait()
                 self._log(msg)
                 drained += 1
         except queue.Empty:
             pass
+        dropped = self._log_dropped
+        if dropped:
+            self._log_dropped = 0
+            self._log(f"... {dropped} log lines dropped (GUI log queue full)", warn=True)
         # Re-arm pump
-        self.root.after(33, self._start_gui_log_pump)
+        busy = drained or not self._log_queue.empty()
+        self.root.after(33 if busy else 100, self._start_gui_log_pump)
 
     def _solve_in_thread(self, case_path):
         logger = logging.getLogger("scheduler")
@@ -2480,7 +2695,7 @@ class TestcaseGUI:
         if not sel:
             messagebox.showerror("Select", "Pick a shift row first."); return
         iid = sel[0]
-        sh = next((x for x in self.case["shifts"] if x.get("id")==iid), None)
+        sh = self._shift_by_id.get(iid)
         if not sh: return
 
         base_id = self.ent_shift_id.get().strip() or sh["id"].split("@")[0]
@@ -2491,80 +2706,116 @@ class TestcaseGUI:
         if not (self._validate_hhmm(st_hm) and self._validate_hhmm(en_hm)):
             messagebox.showerror("Invalid time", "Use HH:MM (24h)."); return
 
+        old_type = sh["type"]
         if self.var_all_days_update.get():
-            dates = set(x["date"] for x in self.case["shifts"])
-            for dd in dates:
-                for s2 in self.shifts_for_date(dd):
-                    if s2.get("id") != iid and s2.get("type") == new_type:
-                        messagebox.showerror("Duplicate type", f"Type '{new_type}' already exists on {dd}."); return
+            if new_type != old_type:
+                # renaming clashes only on days that already carry both types
+                old_dates = {s2["date"] for s2 in self._shifts_by_type.get(old_type, ())}
+                clash = sorted(s2["date"] for s2 in self._shifts_by_type.get(new_type, ())
+                               if s2["date"] in old_dates)
+                if clash:
+                    messagebox.showerror("Duplicate type", f"Type '{new_type}' already exists on {clash[0]}."); return
         else:
             for s2 in self.shifts_for_date(d):
                 if s2.get("id") != iid and s2.get("type") == new_type:
                     messagebox.showerror("Duplicate type", f"Type '{new_type}' already exists on {d}."); return
 
         if self.var_all_days_update.get():
-            old_type = sh["type"]
-            count = 0
-            for obj in self.case["shifts"]:
-                if obj["type"] == old_type:
-                    obj["type"] = new_type
-                    obj["start"] = iso_dt(obj["date"], st_hm)
-                    obj["end"] = iso_dt(obj["date"], en_hm)
-                    count += 1
+            moved = self._shifts_by_type.pop(old_type, [])
+            for obj in moved:
+                od = obj["date"]
+                obj["type"] = new_type
+                obj["start"] = iso_dt(od, st_hm)
+                obj["end"] = iso_dt(od, en_hm)
+                # allowed types are untouched, so only the HH:MM view strings change
+                obj["_start_hm"] = st_hm
+                obj["_end_hm"] = en_hm
+            self._shifts_by_type.setdefault(new_type, []).extend(moved)
+            count = len(moved)
             self._log(f"[shifts] updated {count} shifts (all days) from type '{old_type}' -> '{new_type}'.")
         else:
             new_id_base = base_id
-            new_id = f"{new_id_base}@{d}" if "@" in sh["id"] or any(s.get("id")==new_id_base for s in self.case["shifts"] if s is not sh) else new_id_base
-            if new_id != sh["id"] and any(s.get("id")==new_id for s in self.case["shifts"]):
+            other = self._shift_by_id.get(new_id_base)
+            new_id = f"{new_id_base}@{d}" if "@" in sh["id"] or (other is not None and other is not sh) else new_id_base
+            if new_id != sh["id"] and new_id in self._shift_by_id:
                 messagebox.showerror("Duplicate", f"ID '{new_id}' already exists."); return
+            if new_id != sh["id"]:
+                # rekey in place so the shift keeps its position in the saved case
+                old_id = sh["id"]
+                self._shift_by_id = {(new_id if k == old_id else k): v for k, v in self._shift_by_id.items()}
+                old_base = sh["id"].split("@", 1)[0]
+                new_base = new_id.split("@", 1)[0]
+                if new_base != old_base:
+                    self._shifts_by_base[old_base].remove(sh)
+                    if not self._shifts_by_base[old_base]:
+                        del self._shifts_by_base[old_base]
+                    self._shifts_by_base.setdefault(new_base, []).append(sh)
             sh["id"] = new_id
+            if new_type != old_type:
+                self._shifts_by_type[old_type].remove(sh)
+                if not self._shifts_by_type[old_type]:
+                    del self._shifts_by_type[old_type]
+                self._shifts_by_type.setdefault(new_type, []).append(sh)
             sh["type"] = new_type
             sh["start"] = iso_dt(d, st_hm)
             sh["end"]   = iso_dt_end(d, st_hm, en_hm)  # next-day if needed
             allowed = [t.strip() for t in self.ent_allowed_types.get().split(",") if t.strip()] or ["MD"]
             sh["allowed_provider_types"] = allowed
+            _cache_shift_view(sh)
             self._log(f"[shifts] updated 1 shift ({new_id}).")
 
-        self.refresh_shift_table()
+        self._shifts_version += 1
+        self._schedule_ui("shifts")
 
     def delete_shift(self):
         sel = self.tree_shifts.selection()
         if not sel: return
         iid = sel[0]
-        sh = next((x for x in self.case["shifts"] if x.get("id")==iid), None)
+        sh = self._shift_by_id.get(iid)
         if not sh: return
         d = sh["date"]; t = sh.get("type","")
 
         if self.var_all_days_delete.get():
-            base = sh["id"].split("@")[0]
-            before = len(self.case["shifts"])
-            self.case["shifts"] = [s for s in self.case["shifts"]
-                                   if not (s.get("type")==t or s.get("id","").split("@")[0]==base)]
-            removed = before - len(self.case["shifts"])
-            self._log(f"[shifts] deleted {removed} shifts across all days (type '{t}' or base '{base}').")
+            base = sh["id"].split("@", 1)[0]
+            drop = {s["id"] for s in self._shifts_by_type.get(t, ())}
+            drop.update(s["id"] for s in self._shifts_by_base.get(base, ()))
+            for sid in drop:
+                del self._shift_by_id[sid]
+            self._reindex_shifts()
+            self._log(f"[shifts] deleted {len(drop)} shifts across all days (type '{t}' or base '{base}').")
         else:
-            self.case["shifts"] = [s for s in self.case["shifts"] if s.get("id")!=iid]
+            del self._shift_by_id[iid]
+            for index, key in ((self._shifts_by_date, d),
+                               (self._shifts_by_type, sh.get("type")),
+                               (self._shifts_by_base, iid.split("@", 1)[0])):
+                bucket = index[key]
+                bucket.remove(sh)
+                if not bucket:
+                    del index[key]
+            self._shifts_version += 1
             self._log(f"[shifts] deleted 1 shift ({iid}).")
 
         remaining_types_on_day = {s.get("type","") for s in self.shifts_for_date(d)}
         if t and t not in remaining_types_on_day:
-            for p in self.case.get("providers", []):
-                changed = False
-                for key in ("preferred_days_hard", "preferred_days_soft"):
-                    mp = p.get(key) or {}
-                    L = mp.get(d, None)
-                    if isinstance(L, list) and t in L:
-                        L2 = [x for x in L if x != t]
-                        if L2:
-                            mp[d] = L2; changed = True
-                        else:
-                            mp.pop(d, None); changed = True
-                if changed:
-                    self._log(f"[prefs] cleaned '{t}' from {p.get('name','?')} on {d} (no longer exists).")
-
-        self.refresh_shift_table()
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+            cleaned = {}
+            kept = []
+            for p, key in self._pref_index_by_date.get(d, ()):
+                mp = p.get(key) or {}
+                L = mp.get(d, None)
+                if isinstance(L, list) and t in L:
+                    L2 = [x for x in L if x != t]
+                    if L2:
+                        mp[d] = L2
+                    else:
+                        mp.pop(d, None)
+                    cleaned[id(p)] = p
+                if d in mp:
+                    kept.append((p, key))
+            self._pref_index_by_date[d] = kept
+            for p in cleaned.values():
+                self._log(f"[prefs] cleaned '{t}' from {p.get('name','?')} on {d} (no longer exists).")
+
+        self._schedule_ui("shifts", "summary", "recolor")
 
     # ---------- Providers Tab ----------
     def _build_tab_providers(self, frame):
@@ -2608,6 +2859,7 @@ class TestcaseGUI:
         onf.pack(fill="both", expand=True, pady=8)
         self.lst_days_on = tk.Listbox(onf, selectmode="extended", height=10, exportselection=False)
         self.lst_days_on.pack(fill="both", expand=True)
+        self._track_selection(self.lst_days_on)
         on_btns = ttk.Frame(onf); on_btns.pack(pady=(6,2))
         ttk.Button(on_btns, text="Set FIXED ON", command=self.apply_pref_hard_days).pack(side="left", padx=4)
         ttk.Button(on_btns, text="Set PREFER ON", command=self.apply_pref_soft_days).pack(side="left", padx=4)
@@ -2629,6 +2881,7 @@ class TestcaseGUI:
         body = ttk.Frame(pr); body.pack(fill="both", expand=True)
         self.lb_shifts_on_day = tk.Listbox(body, selectmode="multiple", height=12, exportselection=False)
         self.lb_shifts_on_day.grid(row=0, column=0, padx=6, pady=6)
+        self._track_selection(self.lb_shifts_on_day)
 
         sumf = ttk.LabelFrame(right, text="Provider Preferences Summary")
         sumf.pack(fill="both", expand=True, pady=(6,0))
@@ -2652,8 +2905,9 @@ class TestcaseGUI:
     # Provider tab helpers
     def refresh_providers(self):
         self.lst_providers.delete(0, tk.END)
-        for p in self.case["providers"]:
-            self.lst_providers.insert(tk.END, p.get("name","(no name)"))
+        names = [p.get("name","(no name)") for p in self.case["providers"]]
+        if names:
+            self.lst_providers.insert(tk.END, *names)
 
     def selected_provider_index(self):
         sel = self.lst_providers.curselection()
@@ -2666,11 +2920,35 @@ class TestcaseGUI:
         if idx < 0 or idx >= len(self.case["providers"]): return None
         return self.case["providers"][idx]
 
+    def _poll_selection(self, lst):
+        # day rows mirror _listbox_days[lst], so only curselection() goes to Tcl
+        shown = self._listbox_days.get(lst)
+        if shown is None:
+            return [lst.get(i) for i in lst.curselection()]
+        return [shown[i] for i in lst.curselection()]
+
+    def _track_selection(self, lst):
+        """Keep lst's selected values on the Python side instead of polling Tk on every action."""
+        self._listbox_selection[lst] = []
+        lst.bind("<<ListboxSelect>>", lambda _e, lst=lst: self._on_tracked_select(lst), add="+")
+
+    def _on_tracked_select(self, lst):
+        self._listbox_selection[lst] = self._poll_selection(lst)
+
+    def _reset_tracked_selection(self, lst):
+        # call when lst is refilled or cleared from code; that fires no <<ListboxSelect>>
+        if lst in self._listbox_selection:
+            self._listbox_selection[lst] = []
+
+    def _selected_rows(self, lst):
+        sel = self._listbox_selection.get(lst)
+        return list(sel) if sel is not None else self._poll_selection(lst)
+
     def _selected_days_off(self):
-        return [self.lst_days_off.get(i) for i in self.lst_days_off.curselection()]
+        return self._selected_rows(self.lst_days_off)
 
     def _selected_days_on(self):
-        return [self.lst_days_on.get(i) for i in self.lst_days_on.curselection()]
+        return self._selected_rows(self.lst_days_on)
 
     def add_provider(self):
         name = self.ent_pname.get().strip() or f"Prov{len(self.case['providers'])+1}"
@@ -2680,8 +2958,8 @@ class TestcaseGUI:
         pmax = _parse_int_default(self.ent_pmax.get().strip(), IDENTITY_MAX)
         prov = {
             "name": name, "type": typ,
-            "forbidden_days_hard": [],
-            "forbidden_days_soft": [],
+            "forbidden_days_hard": set(),
+            "forbidden_days_soft": set(),
             "preferred_days_hard": {},
             "preferred_days_soft": {},
             "max_consecutive_days": maxc,
@@ -2707,16 +2985,15 @@ class TestcaseGUI:
         lim["max_total"] = _parse_int_default(self.ent_pmax.get().strip(), IDENTITY_MAX)
         _sanitize_provider_identity_defaults(p)
         self.refresh_providers()
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     def delete_provider(self):
         idx = self.selected_provider_index()
         if idx is None: return
         del self.case["providers"][idx]
+        self._reindex_prefs()
         self.refresh_providers()
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     def on_provider_select(self, event=None):
         p = self.get_provider()
@@ -2731,18 +3008,13 @@ class TestcaseGUI:
         self.refresh_off_boxes()
         self.refresh_provider_days()
         self.refresh_pref_ui_sources()
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     def refresh_off_boxes(self):
-        self.lst_days_off.delete(0, tk.END)
-        for d in self.case["calendar"]["days"]:
-            self.lst_days_off.insert(tk.END, d)
+        self._fill_day_listbox(self.lst_days_off)
 
     def refresh_provider_days(self):
-        self.lst_days_on.delete(0, tk.END)
-        for d in self.case["calendar"]["days"]:
-            self.lst_days_on.insert(tk.END, d)
+        self._fill_day_listbox(self.lst_days_on)
 
     def apply_fixed_off_days(self):
         p = self.get_provider()
@@ -2750,11 +3022,10 @@ class TestcaseGUI:
             messagebox.showerror("No provider", "Select a provider first.")
             return
         sel = self._selected_days_off()
-        p["forbidden_days_hard"] = sorted(set(p.get("forbidden_days_hard", [])) | set(sel))
-        p["forbidden_days_soft"] = [d for d in p.get("forbidden_days_soft", []) if d not in sel]
+        p["forbidden_days_hard"].update(sel)
+        p["forbidden_days_soft"].difference_update(sel)
         self._log(f"[prefs] set FIXED OFF ({len(sel)} days) for {p.get('name','?')}")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     def apply_prefer_off_days(self):
         p = self.get_provider()
@@ -2762,11 +3033,10 @@ class TestcaseGUI:
             messagebox.showerror("No provider", "Select a provider first.")
             return
         sel = self._selected_days_off()
-        p["forbidden_days_soft"] = sorted(set(p.get("forbidden_days_soft", [])) | set(sel))
-        p["forbidden_days_hard"] = [d for d in p.get("forbidden_days_hard", []) if d not in sel]
+        p["forbidden_days_soft"].update(sel)
+        p["forbidden_days_hard"].difference_update(sel)
         self._log(f"[prefs] set PREFER OFF ({len(sel)} days) for {p.get('name','?')}")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     def clear_off_days(self):
         p = self.get_provider()
@@ -2775,33 +3045,39 @@ class TestcaseGUI:
         sel = set(self._selected_days_off())
         if not sel:
             self._log("[warn] Pick one or more OFF days to clear.", warn=True); return
-        p["forbidden_days_hard"] = [d for d in p.get("forbidden_days_hard", []) if d not in sel]
-        p["forbidden_days_soft"] = [d for d in p.get("forbidden_days_soft", []) if d not in sel]
+        p["forbidden_days_hard"].difference_update(sel)
+        p["forbidden_days_soft"].difference_update(sel)
         self._log(f"[prefs] cleared OFF flags on {len(sel)} day(s) for {p.get('name','?')}.")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._schedule_ui("summary", "recolor")
 
     # ON prefs helpers
+    def _allowed_types_on(self, d, ptype):
+        """frozenset of shift types on date d open to provider type ptype (cached per shifts version)."""
+        if self._allowed_types_cache_version != self._shifts_version:
+            self._allowed_types_cache = {}
+            self._allowed_types_cache_version = self._shifts_version
+        key = (d, ptype)
+        types = self._allowed_types_cache.get(key)
+        if types is None:
+            types = frozenset(sh["type"] for sh in self.shifts_for_date(d)
+                              if ptype in sh["_allowed_set"] and sh.get("type"))
+            self._allowed_types_cache[key] = types
+        return types
+
     def shift_types_by_date_filtered(self, d):
         p = self.get_provider()
         if not p or not d:
             return []
-        ptype = p.get("type","MD")
-        types = set()
-        for sh in self.case["shifts"]:
-            if sh.get("date") == d:
-                allowed = set(sh.get("allowed_provider_types", ["MD"]))
-                if ptype in allowed:
-                    t = sh.get("type","")
-                    if t: types.add(t)
-        return sorted(types)
+        return sorted(self._allowed_types_on(d, p.get("type","MD")))
 
     def refresh_shift_boxes(self, event=None):
         self.lb_shifts_on_day.delete(0, tk.END)
+        self._reset_tracked_selection(self.lb_shifts_on_day)
         d = self.cmb_pref_date.get()
         if not d: return
-        for t in self.shift_types_by_date_filtered(d):
-            self.lb_shifts_on_day.insert(tk.END, t)
+        types = self.shift_types_by_date_filtered(d)
+        if types:
+            self.lb_shifts_on_day.insert(tk.END, *types)
 
     def refresh_pref_ui_sources(self):
         days = self.case["calendar"]["days"]
@@ -2811,67 +3087,60 @@ class TestcaseGUI:
         self.refresh_shift_boxes()
 
     def render_provider_summary(self):
-        self.txt_pref_summary.delete("1.0", tk.END)
+        txt = self.txt_pref_summary
         p = self.get_provider()
         if not p:
+            txt.delete("1.0", tk.END)
             return
         _sanitize_provider_identity_defaults(p)
-        lines = []
-        lines.append(f"Provider: {p.get('name','?')}  (type={p.get('type','MD')})")
         lim = p.get("limits", {})
-        lines.append(f"Limits: min_total={lim.get('min_total',0)} max_total={lim.get('max_total',IDENTITY_MAX)}")
-        lines.append(f"max_consecutive_days: {p.get('max_consecutive_days', IDENTITY_MAX)}")
-        lines.append("")
-        lines.append("Fixed OFF days:")
-        for d in p.get("forbidden_days_hard", []):
-            lines.append(f"  - {d}")
+        lines = [
+            f"Provider: {p.get('name','?')}  (type={p.get('type','MD')})",
+            f"Limits: min_total={lim.get('min_total',0)} max_total={lim.get('max_total',IDENTITY_MAX)}",
+            f"max_consecutive_days: {p.get('max_consecutive_days', IDENTITY_MAX)}",
+            "",
+            "Fixed OFF days:",
+        ]
+        lines.extend(f"  - {d}" for d in sorted(p.get("forbidden_days_hard", ())))
         lines.append("Prefer OFF days:")
-        for d in p.get("forbidden_days_soft", []):
-            lines.append(f"  - {d}")
+        lines.extend(f"  - {d}" for d in sorted(p.get("forbidden_days_soft", ())))
         lines.append("")
         lines.append("Fixed ON (date → types):")
-        for d, L in sorted((p.get("preferred_days_hard") or {}).items()):
-            lines.append(f"  - {d}: {', '.join(L) if L else '(none)'}")
-        lines[-1] = lines[-1].replace("', '", "', '")
+        lines.extend(f"  - {d}: {', '.join(L) if L else '(none)'}"
+                     for d, L in sorted((p.get("preferred_days_hard") or {}).items()))
         lines.append("Prefer ON (date → types):")
-        for d, L in sorted((p.get("preferred_days_soft") or {}).items()):
-            lines.append(f"  - {d}: {', '.join(L) if L else '(none)'}")
-        self.txt_pref_summary.insert(tk.END, "\n".join(lines))
+        lines.extend(f"  - {d}: {', '.join(L) if L else '(none)'}"
+                     for d, L in sorted((p.get("preferred_days_soft") or {}).items()))
+        txt.delete("1.0", tk.END)
+        txt.insert("1.0", "\n".join(lines))
 
     def _selected_shift_types_from_listbox(self):
-        return [self.lb_shifts_on_day.get(i) for i in self.lb_shifts_on_day.curselection()]
+        return self._selected_rows(self.lb_shifts_on_day)
 
-    def apply_pref_hard_days(self):
+    def _apply_pref_on(self, key, label):
         p = self.get_provider()
         days = self._selected_days_on()
         if not p or not days:
             self._log("[warn] Pick a provider and one or more ON days.", warn=True)
             return
         chosen = self._selected_shift_types_from_listbox()
-        hard = p.setdefault("preferred_days_hard", {})
+        prefs = p.setdefault(key, {})
+        chosen_sorted = sorted(chosen)
+        ptype = p.get("type","MD")
+        index = self._pref_index_by_date
         for d in days:
-            allowed_today = set(self.shift_types_by_date_filtered(d))
-            val = sorted(t for t in chosen if t in allowed_today)
-            hard[d] = val
-        self._log(f"[prefs] set FIXED ON on {len(days)} day(s) for {p.get('name','?')}: {', '.join(chosen) if chosen else '(none)'}")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+            allowed_today = self._allowed_types_on(d, ptype)
+            if d not in prefs:
+                index.setdefault(d, []).append((p, key))
+            prefs[d] = [t for t in chosen_sorted if t in allowed_today]
+        self._log(f"[prefs] set {label} on {len(days)} day(s) for {p.get('name','?')}: {', '.join(chosen) if chosen else '(none)'}")
+        self._schedule_ui("summary", "recolor")
+
+    def apply_pref_hard_days(self):
+        self._apply_pref_on("preferred_days_hard", "FIXED ON")
 
     def apply_pref_soft_days(self):
-        p = self.get_provider()
-        days = self._selected_days_on()
-        if not p or not days:
-            self._log("[warn] Pick a provider and one or more ON days.", warn=True)
-            return
-        chosen = self._selected_shift_types_from_listbox()
-        soft = p.setdefault("preferred_days_soft", {})
-        for d in days:
-            allowed_today = set(self.shift_types_by_date_filtered(d))
-            val = sorted(t for t in chosen if t in allowed_today)
-            soft[d] = val
-        self._log(f"[prefs] set PREFER ON on {len(days)} day(s) for {p.get('name','?')}: {', '.join(chosen) if chosen else '(none)'}")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
+        self._apply_pref_on("preferred_days_soft", "PREFER ON")
 
     def action_clear_prefs(self):
         p = self.get_provider()
@@ -2884,61 +3153,64 @@ class TestcaseGUI:
         for d in days:
             hard_map.pop(d, None)
             soft_map.pop(d, None)
+            refs = self._pref_index_by_date.get(d)
+            if refs:
+                self._pref_index_by_date[d] = [(q, key) for q, key in refs if q is not p]
         self._log(f"[prefs] cleared ON prefs on {len(days)} day(s) for {p.get('name','?')}.")
-        self.render_provider_summary()
-        self._recolor_off_on_days()
-
-    def _recolor_off_on_days(self):
-        def reset_colors(lst, default_bg):
+        self._schedule_ui("summary", "recolor")
+
+    def _apply_day_colors(self, lst, wanted, default_bg):
+        """Recolor `lst` to `wanted` ({row: bg}, others default), touching only rows whose bg changes."""
+        shown = self._day_colors.get(lst)
+        if shown is None:
+            # colors unknown (e.g. a failed pass): repaint every row
+            changes = [(i, wanted.get(i, default_bg)) for i in range(lst.size())]
+        else:
+            changes = [(i, default_bg) for i in shown.keys() - wanted.keys()]
+            changes.extend((i, bg) for i, bg in wanted.items() if shown.get(i) != bg)
+        if changes:
+            # one Tcl script per listbox instead of one itemconfig round-trip per row
+            script = "\n".join(f"{lst._w} itemconfigure {i} -background {{{bg}}}" for i, bg in changes)
             try:
-                n = lst.size()
-                for i in range(n):
-                    lst.itemconfig(i, bg=default_bg)
-            except Exception:
-                pass
-
-        if self._bg_off_default is not None:
-            reset_colors(self.lst_days_off, self._bg_off_default)
-        if self._bg_on_default is not None:
-            reset_colors(self.lst_days_on, self._bg_on_default)
+                lst.tk.eval(script)
+            except tk.TclError:
+                # the script may have stopped part-way; forget what is shown
+                self._day_colors.pop(lst, None)
+                return
+        self._day_colors[lst] = wanted
 
-        p = self.get_provider()
-        if not p:
+    def _recolor_off_on_days(self):
+        if self._bg_off_default is None or self._bg_on_default is None:
             return
+        off_colors, on_colors = {}, {}
+        p = self.get_provider()
+        if p:
+            fixed_off = p.get("forbidden_days_hard", ())
+            prefer_off = p.get("forbidden_days_soft", ())
+            fixed_on = set(d for d, L in (p.get("preferred_days_hard") or {}).items() if L)
+            prefer_on = set(d for d, L in (p.get("preferred_days_soft") or {}).items() if L)
 
-        days = self.case["calendar"]["days"]
-
-        fixed_off = set(p.get("forbidden_days_hard", []))
-        prefer_off = set(p.get("forbidden_days_soft", []))
-        fixed_on = set(d for d, L in (p.get("preferred_days_hard") or {}).items() if L)
-        prefer_on = set(d for d, L in (p.get("preferred_days_soft") or {}).items() if L)
-
-        for i, d in enumerate(days):
-            try:
+            for i, d in enumerate(self.case["calendar"]["days"]):
                 if d in fixed_off:
-                    self.lst_days_off.itemconfig(i, bg=OFF_FIXED_BG)
+                    off_colors[i] = OFF_FIXED_BG
                 elif d in prefer_off:
-                    self.lst_days_off.itemconfig(i, bg=OFF_PREFER_BG)
-            except Exception:
-                pass
-
-        for i, d in enumerate(days):
-            try:
+                    off_colors[i] = OFF_PREFER_BG
                 if d in fixed_on:
-                    self.lst_days_on.itemconfig(i, bg=ON_FIXED_BG)
+                    on_colors[i] = ON_FIXED_BG
                 elif d in prefer_on:
-                    self.lst_days_on.itemconfig(i, bg=ON_PREFER_BG)
-            except Exception:
-                pass
+                    on_colors[i] = ON_PREFER_BG
+
+        self._apply_day_colors(self.lst_days_off, off_colors, self._bg_off_default)
+        self._apply_day_colors(self.lst_days_on, on_colors, self._bg_on_default)
 
     # ---------- Config Tab ----------
     def _build_tab_config(self, frame):
         sol = ttk.LabelFrame(frame, text="constants.solver")
         sol.pack(fill="x", padx=8, pady=8)
-        self.ent_s_time = ttk.Entry(sol, width=10)
-        self.ent_s_phase = ttk.Entry(sol, width=10)
-        self.ent_s_gap = ttk.Entry(sol, width=10)
-        self.ent_s_threads = ttk.Entry(sol, width=10)
+        self.var_s_time = tk.StringVar(); self.ent_s_time = ttk.Entry(sol, width=10, textvariable=self.var_s_time)
+        self.var_s_phase = tk.StringVar(); self.ent_s_phase = ttk.Entry(sol, width=10, textvariable=self.var_s_phase)
+        self.var_s_gap = tk.StringVar(); self.ent_s_gap = ttk.Entry(sol, width=10, textvariable=self.var_s_gap)
+        self.var_s_threads = tk.StringVar(); self.ent_s_threads = ttk.Entry(sol, width=10, textvariable=self.var_s_threads)
         row = 0
         for lbl, ent, hint in [
             ("max_time_in_seconds", self.ent_s_time, "e.g., 350"),
@@ -2953,10 +3225,10 @@ class TestcaseGUI:
 
         run = ttk.LabelFrame(frame, text="run (defaults shown in Run tab too)")
         run.pack(fill="x", padx=8, pady=8)
-        self.ent_cfg_out = ttk.Entry(run, width=18)
-        self.ent_cfg_k   = ttk.Entry(run, width=8)
-        self.ent_cfg_seed= ttk.Entry(run, width=12)
-        self.ent_cfg_time= ttk.Entry(run, width=10)
+        self.var_cfg_out = tk.StringVar(); self.ent_cfg_out = ttk.Entry(run, width=18, textvariable=self.var_cfg_out)
+        self.var_cfg_k   = tk.StringVar(); self.ent_cfg_k   = ttk.Entry(run, width=8, textvariable=self.var_cfg_k)
+        self.var_cfg_seed= tk.StringVar(); self.ent_cfg_seed= ttk.Entry(run, width=12, textvariable=self.var_cfg_seed)
+        self.var_cfg_time= tk.StringVar(); self.ent_cfg_time= ttk.Entry(run, width=10, textvariable=self.var_cfg_time)
         for r,(lbl, ent) in enumerate([
             ("out", self.ent_cfg_out), ("k", self.ent_cfg_k),
             ("seed", self.ent_cfg_seed), ("time", self.ent_cfg_time)
@@ -2968,10 +3240,10 @@ class TestcaseGUI:
         adv.pack(fill="both", expand=True, padx=8, pady=8)
         ttk.Label(adv, text="constants.weights").grid(row=0, column=0, sticky="w")
         ttk.Label(adv, text="constants.objective").grid(row=0, column=1, sticky="w")
-        self.txt_weights = tk.Text(adv, width=48, height=12)
-        self.txt_objective = tk.Text(adv, width=32, height=12)
-        self.txt_weights.grid(row=1, column=0, padx=6, pady=6, sticky="nsew")
-        self.txt_objective.grid(row=1, column=1, padx=6, pady=6, sticky="nsew")
+        # The JSON editors are created the first time the Config tab is shown
+        # (_ensure_json_editors); until then they are None.
+        self._adv_frame = adv
+        self.txt_weights = self.txt_objective = None
 
         adv.grid_columnconfigure(0, weight=1)
         adv.grid_columnconfigure(1, weight=1)
@@ -2979,34 +3251,65 @@ class TestcaseGUI:
 
         ttk.Button(frame, text="Apply Config to Case", command=self.apply_config).pack(pady=8)
 
+    def _on_tab_changed(self, event):
+        if event.widget.select() == str(self.tab_cfg):
+            self._ensure_json_editors()
+
+    def _ensure_json_editors(self):
+        if self.txt_weights is not None:
+            return
+        adv = self._adv_frame
+        self.txt_weights = tk.Text(adv, width=48, height=12)
+        self.txt_objective = tk.Text(adv, width=32, height=12)
+        self.txt_weights.grid(row=1, column=0, padx=6, pady=6, sticky="nsew")
+        self.txt_objective.grid(row=1, column=1, padx=6, pady=6, sticky="nsew")
+        self._load_json_editors()
+
     def load_config_into_ui(self):
         c = self.case.get("constants", {}) or {}
         s = c.get("solver", {}) or {}
-        w = c.get("weights", {}) or {}
-        o = c.get("objective", {}) or {}
         r = self.case.get("run", {}) or {}
 
-        self.ent_s_time.delete(0, tk.END);   self.ent_s_time.insert(0, str(s.get("max_time_in_seconds","")))
-        self.ent_s_phase.delete(0, tk.END);  self.ent_s_phase.insert(0, str(s.get("phase1_fraction","")))
-        self.ent_s_gap.delete(0, tk.END);    self.ent_s_gap.insert(0, str(s.get("relative_gap","")))
-        self.ent_s_threads.delete(0, tk.END);self.ent_s_threads.insert(0, str(s.get("num_threads","")))
+        self.var_s_time.set(str(s.get("max_time_in_seconds","")))
+        self.var_s_phase.set(str(s.get("phase1_fraction","")))
+        self.var_s_gap.set(str(s.get("relative_gap","")))
+        self.var_s_threads.set(str(s.get("num_threads","")))
 
-        self.ent_cfg_out.delete(0, tk.END); self.ent_cfg_out.insert(0, r.get("out",""))
-        self.ent_cfg_k.delete(0, tk.END);   self.ent_cfg_k.insert(0, str(r.get("k","")))
-        self.ent_cfg_seed.delete(0, tk.END); self.ent_cfg_seed.insert(0, "" if r.get("seed",None) is None else str(r.get("seed")))
-        self.ent_cfg_time.delete(0, tk.END); self.ent_cfg_time.insert(0, str(r.get("time","")))
+        self.var_cfg_out.set(r.get("out",""))
+        self.var_cfg_k.set(str(r.get("k","")))
+        self.var_cfg_seed.set("" if r.get("seed",None) is None else str(r.get("seed")))
+        self.var_cfg_time.set(str(r.get("time","")))
 
-        self.ent_out.delete(0, tk.END); self.ent_out.insert(0, r.get("out",""))
-        self.ent_r_k.delete(0, tk.END); self.ent_r_k.insert(0, str(r.get("k","")))
-        self.ent_r_L.delete(0, tk.END); self.ent_r_L.insert(0, str(r.get("L","")))
-        self.ent_r_seed.delete(0, tk.END); self.ent_r_seed.insert(0, "" if r.get("seed",None) is None else str(r.get("seed")))
-        self.ent_r_time.delete(0, tk.END); self.ent_r_time.insert(0, str(r.get("time","")))
+        self.var_out.set(r.get("out",""))
+        self.var_r_k.set(str(r.get("k","")))
+        self.var_r_L.set(str(r.get("L","")))
+        self.var_r_seed.set("" if r.get("seed",None) is None else str(r.get("seed")))
+        self.var_r_time.set(str(r.get("time","")))
 
-        self.txt_weights.delete("1.0", tk.END); self.txt_weights.insert(tk.END, json.dumps(w, indent=2))
-        self.txt_objective.delete("1.0", tk.END); self.txt_objective.insert(tk.END, json.dumps(o, indent=2))
+        self._load_json_editors()
+
+    def _load_json_editors(self):
+        if self.txt_weights is None:
+            return
+        c = self.case.get("constants", {}) or {}
+        self._set_json_editor(self.txt_weights, c.get("weights", {}) or {})
+        self._set_json_editor(self.txt_objective, c.get("objective", {}) or {})
+
+    def _set_json_editor(self, widget, obj):
+        # indent=2 goes through the pure-Python encoder; reuse the last text
+        # while the dict is unchanged (the usual case on refresh_all)
+        cached = self._json_editor_cache.get(widget)
+        if cached is not None and cached[0] == obj:
+            text = cached[1]
+        else:
+            text = json.dumps(obj, indent=2)
+            self._json_editor_cache[widget] = (copy.deepcopy(obj), text)
+        widget.delete("1.0", tk.END); widget.insert(tk.END, text)
 
     def apply_config(self):
         def _parse_json_editor(widget, label):
+            if widget is None:  # Config tab never opened: nothing edited
+                return None
             txt = widget.get("1.0", "end").strip()
             if not txt:
                 return None
@@ -3018,33 +3321,38 @@ class TestcaseGUI:
                 raise ValueError(f"{label} must be a JSON object.")
             return obj
 
-        try:
-            s = self.case.setdefault("constants", {}).setdefault("solver", {})
-            if self.ent_s_time.get().strip() != "":   s["max_time_in_seconds"] = float(self.ent_s_time.get().strip())
-            if self.ent_s_phase.get().strip() != "":  s["phase1_fraction"]     = float(self.ent_s_phase.get().strip())
-            if self.ent_s_gap.get().strip() != "":    s["relative_gap"]        = float(self.ent_s_gap.get().strip())
-            if self.ent_s_threads.get().strip() != "":s["num_threads"]         = int(self.ent_s_threads.get().strip())
+        def _set_if(target, fields):
+            # fields: (var, key, conv); blank entries leave the current value
+            for var, key, conv in fields:
+                txt = var.get().strip()
+                if txt:
+                    target[key] = conv(txt)
 
+        try:
             consts = self.case.setdefault("constants", {})
+            _set_if(consts.setdefault("solver", {}), (
+                (self.var_s_time,    "max_time_in_seconds", float),
+                (self.var_s_phase,   "phase1_fraction",     float),
+                (self.var_s_gap,     "relative_gap",        float),
+                (self.var_s_threads, "num_threads",         int),
+            ))
 
             parsed_w = _parse_json_editor(self.txt_weights, "constants.weights")
             if parsed_w is not None:
-                existing_w = consts.get("weights", {})
-                merged_w = dict(existing_w); merged_w.update(parsed_w)
-                consts["weights"] = merged_w
+                consts["weights"] = {**consts.get("weights", {}), **parsed_w}
 
             parsed_o = _parse_json_editor(self.txt_objective, "constants.objective")
             if parsed_o is not None:
-                existing_o = consts.get("objective", {})
-                merged_o = dict(existing_o); merged_o.update(parsed_o)
-                consts["objective"] = merged_o
+                consts["objective"] = {**consts.get("objective", {}), **parsed_o}
 
             r = self.case.setdefault("run", {})
-            if self.ent_cfg_out.get().strip() != "":   r["out"]  = self.ent_cfg_out.get().strip()
-            if self.ent_cfg_k.get().strip() != "":     r["k"]    = int(self.ent_cfg_k.get().strip())
-            seed_txt = self.ent_cfg_seed.get().strip()
+            _set_if(r, (
+                (self.var_cfg_out,  "out",  str),
+                (self.var_cfg_k,    "k",    int),
+                (self.var_cfg_time, "time", float),
+            ))
+            seed_txt = self.var_cfg_seed.get().strip()
             r["seed"] = None if seed_txt=="" else int(seed_txt)
-            if self.ent_cfg_time.get().strip() != "":  r["time"] = float(self.ent_cfg_time.get().strip())
 
             self.load_config_into_ui()
             self._log("[config] Applied to case.")
@@ -3053,50 +3361,33 @@ class TestcaseGUI:
 
     # ---------- File ops ----------
     def new_case(self):
-        self.case = json.loads(json.dumps(DEFAULT_CASE))
+        self.case = copy.deepcopy(DEFAULT_CASE)
         self.case["run"]["out"] = now_out_name()
         self.current_path = None
+        self._adopt_case_shifts()
         self.refresh_all(select_first=True)
 
     def _normalize_loaded_case(self, case_dict):
         consts = case_dict.setdefault("constants", {})
-        consts.setdefault("solver", DEFAULT_CONSTANTS["solver"])
+        consts.setdefault("solver", dict(_DEFAULTS_SOLVER))
         weights = consts.setdefault("weights", {})
-        hard = weights.setdefault("hard", {})
-        hard.setdefault("slack_unfilled", 1)
-        hard.setdefault("slack_shift_less", 1)
-        hard.setdefault("slack_shift_more", 1)
-        hard.setdefault("slack_cant_work", 1)
-        hard.setdefault("slack_consec", 1)
-        soft = weights.setdefault("soft", {})
-        soft.setdefault("cluster", DEFAULT_CONSTANTS["weights"]["soft"]["cluster"])
-        soft.setdefault("cluster_size", DEFAULT_CONSTANTS["weights"]["soft"]["cluster_size"])
-        soft.setdefault("requested_off", DEFAULT_CONSTANTS["weights"]["soft"]["requested_off"])
-        soft.setdefault("days_wanted_not_met", DEFAULT_CONSTANTS["weights"]["soft"]["days_wanted_not_met"])
-        soft.setdefault("cluster_weekend_start", DEFAULT_CONSTANTS["weights"]["soft"]["cluster_weekend_start"])
-        soft.setdefault("unfair_number", DEFAULT_CONSTANTS["weights"]["soft"]["unfair_number"])
-        consts.setdefault("objective", DEFAULT_CONSTANTS["objective"])
-
-        run = case_dict.setdefault("run", {})
-        run.setdefault("out", now_out_name())
-        run.setdefault("k", DEFAULT_RUN["k"])
-        run.setdefault("L", DEFAULT_RUN["L"])
-        run.setdefault("seed", DEFAULT_RUN["seed"])
-        run.setdefault("time", DEFAULT_RUN["time"])
-
-        case_dict.setdefault("calendar", {})
-        case_dict["calendar"].setdefault("days", [])
-        case_dict["calendar"].setdefault("weekend_days", ["Saturday","Sunday"])
+        weights["hard"] = {**_LOADED_HARD_DEFAULTS, **(weights.get("hard") or {})}
+        weights["soft"] = {**_DEFAULTS_SOFT, **(weights.get("soft") or {})}
+        consts.setdefault("objective", dict(_DEFAULTS_OBJECTIVE))
+
+        run = case_dict.get("run") or {}
+        case_dict["run"] = {**DEFAULT_RUN, "out": now_out_name(), **run}
+
+        cal = case_dict.setdefault("calendar", {})
+        cal.setdefault("days", [])
+        cal.setdefault("weekend_days", ["Saturday","Sunday"])
         case_dict.setdefault("shifts", [])
-        case_dict.setdefault("providers", [])
-        for p in case_dict["providers"]:
+        for p in case_dict.setdefault("providers", []):
             if isinstance(p.get("preferred_days_soft"), list):
                 p["preferred_days_soft"] = {}
             if isinstance(p.get("preferred_days_hard"), list):
                 p["preferred_days_hard"] = {}
-            p.setdefault("forbidden_days_hard", [])
-            p.setdefault("forbidden_days_soft", [])
-            # Identity defaults (no nulls)
+            # Identity defaults (no nulls); also fills missing forbidden_days_* with empty sets
             _sanitize_provider_identity_defaults(p)
         _normalize_overnight_shifts(case_dict["shifts"])
         return case_dict
@@ -3106,7 +3397,9 @@ class TestcaseGUI:
             raw = json.load(f)
         self.case = self._normalize_loaded_case(raw)
         self.current_path = fp
-        self.refresh_all(select_first=True)
+        self._adopt_case_shifts()
+        # rebuild the widgets once Tk is idle, so the file dialog closes first
+        self._schedule_ui("all")
 
     def load_case(self):
         fp = filedialog.askopenfilename(title="Load case JSON", filetypes=[("JSON","*.json")])
@@ -3132,12 +3425,15 @@ class TestcaseGUI:
                 pass
 
     def _validate_case(self):
+        self._sync_case_shifts()
         errors = []
-        days = set(self.case["calendar"]["days"])
+        days = frozenset(self.case["calendar"]["days"])
         for sh in self.case["shifts"]:
             if sh.get("date") not in days:
                 errors.append(f"Shift {sh.get('id')} has date not in calendar: {sh.get('date')}")
-            for key in ("id","type","start","end"):
+            if _REQUIRED_SHIFT_KEY_SET <= sh.keys():
+                continue
+            for key in _REQUIRED_SHIFT_KEYS[:-1]:
                 if key not in sh:
                     errors.append(f"Shift missing field '{key}': {sh}")
             if "allowed_provider_types" not in sh:
@@ -3158,12 +3454,13 @@ class TestcaseGUI:
         if not self.current_path:
             return self.save_case_as()
         try:
+            self._sync_case_shifts()
             _sanitize_case_no_nulls(self.case)
             if not self._validate_case():
                 if not messagebox.askyesno("Validation", "Case has issues. Save anyway?"):
                     return
             with open(self.current_path, "w", encoding="utf-8") as f:
-                json.dump(self.case, f, indent=2)
+                json.dump(_serialize_case(self.case), f, indent=2)
             self._log(f"[save] wrote {self.current_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save:\n{e}")
@@ -3183,13 +3480,15 @@ class TestcaseGUI:
         self.randomly_perturb_case(r["pct_providers"]/100.0, r["pct_shifts"]/100.0, r["seed"], r["tweak_weekend"])
 
     def randomly_perturb_case(self, frac_prov=0.25, frac_shift=0.25, seed=None, tweak_weekend=True):
+        self._sync_case_shifts()
         rng = random.Random(seed)
         days = list(self.case.get("calendar", {}).get("days", []))
         if not days:
             messagebox.showerror("No calendar", "Generate or load a calendar first.")
             return
 
-        all_shift_types = sorted({sh.get("type","") for sh in self.case.get("shifts", [])} - {""})
+        all_shift_types = self.all_shift_types()
+        n_types_all = len(all_shift_types)
         all_provider_types = sorted({p.get("type","MD") for p in self.case.get("providers", [])} | set(CANON_PROVIDER_TYPES))
 
         provs = self.case.get("providers", [])
@@ -3203,22 +3502,12 @@ class TestcaseGUI:
             if rng.random() < 0.4:
                 # Only numeric choices (no None)
                 p["max_consecutive_days"] = rng.choice([rng.randint(4, 14), rng.randint(15, 22), IDENTITY_MAX])
-            if rng.random() < 0.6:
-                forb = set(p.get("forbidden_days_hard", []))
-                n_flip = rng.randint(0, max(1, len(days)//10))
-                for _ in range(n_flip):
-                    d = rng.choice(days)
-                    if d in forb: forb.remove(d)
-                    else: forb.add(d)
-                p["forbidden_days_hard"] = sorted(forb)
-            if rng.random() < 0.6:
-                soft = set(p.get("forbidden_days_soft", []))
-                n_flip = rng.randint(0, max(1, len(days)//12))
-                for _ in range(n_flip):
-                    d = rng.choice(days)
-                    if d in soft: soft.remove(d)
-                    else: soft.add(d)
-                p["forbidden_days_soft"] = sorted(soft)
+            for key, per in (("forbidden_days_hard", 10), ("forbidden_days_soft", 12)):
+                if rng.random() < 0.6:
+                    # draw all toggles at once; a day drawn an even number of times ends unchanged
+                    picks = rng.choices(days, k=rng.randint(0, max(1, len(days)//per)))
+                    flips = {d for d, n in collections.Counter(picks).items() if n % 2}
+                    p[key] = set(p.get(key, ())) ^ flips
             for key, prob in (("preferred_days_hard", 0.5), ("preferred_days_soft", 0.7)):
                 if rng.random() < prob:
                     prefs = p.get(key) or {}
@@ -3230,7 +3519,9 @@ class TestcaseGUI:
                         else:
                             if all_shift_types:
                                 n_types = rng.randint(1, min(3, max(1, len(all_shift_types))))
-                                prefs[d] = sorted(rng.sample(all_shift_types, n_types))
+                                # all_shift_types is sorted: sampling positions and sorting those
+                                # gives the same list as sorting the sampled names
+                                prefs[d] = [all_shift_types[i] for i in sorted(rng.sample(range(n_types_all), n_types))]
             _sanitize_provider_identity_defaults(p)
 
         shifts = self.case.get("shifts", [])
@@ -3239,6 +3530,8 @@ class TestcaseGUI:
         sh_idx = rng.sample(range(n_sh), k_sh) if k_sh and n_sh else []
 
         time_choices = ["06:00","07:00","08:00","12:00","16:00","18:00","20:00","22:00"]
+        start_choices = time_choices[:-2]
+        later_by_start = {t: time_choices[bisect.bisect_right(time_choices, t):] for t in start_choices}
 
         for idx in sh_idx:
             sh = shifts[idx]
@@ -3256,8 +3549,8 @@ class TestcaseGUI:
             if rng.random() < 0.8 and all_shift_types:
                 sh["type"] = rng.choice(all_shift_types)
             if rng.random() < 0.85:
-                start_choice = rng.choice(time_choices[:-2])
-                later_choices = [t for t in time_choices if t > start_choice]
+                start_choice = rng.choice(start_choices)
+                later_choices = later_by_start[start_choice]
                 end_choice = rng.choice(later_choices) if later_choices else "23:00"
                 sh["start"] = iso_dt(d, start_choice)
                 sh["end"]   = iso_dt(d, end_choice)
@@ -3270,10 +3563,10 @@ class TestcaseGUI:
 
     # ---------- Run solver ----------
     def open_out_folder(self):
-        out = self.ent_out.get().strip()
+        out = self.var_out.get().strip()
         if not out:
             out = now_out_name()
-            self.ent_out.delete(0, tk.END); self.ent_out.insert(0, out)
+            self.var_out.set(out)
         p = Path(out)
         if not p.exists():
             p.mkdir(parents=True, exist_ok=True)
@@ -3286,16 +3579,16 @@ class TestcaseGUI:
 
     def run_solver(self):
         r = self.case.setdefault("run", {})
-        out = self.ent_out.get().strip() or now_out_name()
-        self.ent_out.delete(0, tk.END); self.ent_out.insert(0, out)
+        out = self.var_out.get().strip() or now_out_name()
+        self.var_out.set(out)
         r["out"] = out
         try:
-            r["k"] = int(self.ent_r_k.get().strip() or r.get("k", 5))
-            L_txt = self.ent_r_L.get().strip()
+            r["k"] = int(self.var_r_k.get().strip() or r.get("k", 5))
+            L_txt = self.var_r_L.get().strip()
             r["L"] = int(L_txt) if L_txt != "" else int(r.get("L", 0))
-            seed_txt = self.ent_r_seed.get().strip()
+            seed_txt = self.var_r_seed.get().strip()
             r["seed"] = None if seed_txt=="" else int(seed_txt)
-            time_minutes = float(self.ent_r_time.get().strip() or r.get("time", 180.0))
+            time_minutes = float(self.var_r_time.get().strip() or r.get("time", 180.0))
             r["time"] = time_minutes
         except Exception as e:
             messagebox.showerror("Run", f"Bad run parameters: {e}")
@@ -3318,10 +3611,11 @@ class TestcaseGUI:
         case_path = (odir / "case.json").resolve()
         case_path = os.path.abspath(case_path)  # before Solve_test_case(...)
 
+        # The child only reads this file after the with-block has closed it, so
+        # no fsync is needed; it is machine-read, so write it compact.
+        self._sync_case_shifts()
         with open(case_path, "w", encoding="utf-8") as f:
-            json.dump(_sanitize_case_no_nulls(self.case), f, indent=2)
-            f.flush()
-            os.fsync(f.fileno())  # make sure file is on disk before spawning
+            json.dump(_serialize_case(_sanitize_case_no_nulls(self.case)), f, separators=(",", ":"))
 
         self._log(f"=== RUN @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
         self._log(f"[run] scheduler_sat.py → {odir}. k={r['k']}  L={r.get('L',0)}  time_min={r['time']}")
@@ -3331,25 +3625,12 @@ class TestcaseGUI:
 
         this_script = os.path.abspath(__file__)
 
-        self._proc = subprocess.Popen(
-            [sys.executable, this_script, "--_solver_child", "--case", str(case_path)],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
-
-        self._io_thread = threading.Thread(target=self._pump_proc_output, daemon=True)
-        self._io_thread.start()
-        self._drain_log_queue()
-
         # Start child; capture stdout+stderr line-buffered
         self._proc = subprocess.Popen(
             [sys.executable, this_script, "--_solver_child", "--case", str(case_path)],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,           # universal_newlines
-            bufsize=1            # line-buffered
+            bufsize=0            # raw pipe: read() returns whatever is available
         )
 
         # Pump the child's output on a background thread into our internal queue…
@@ -3369,36 +3650,58 @@ class TestcaseGUI:
             self._warn_to_log("[no active run]")
 
     def _pump_proc_output(self):
+        # Read the pipe in blocks and queue each block's complete lines as one
+        # list, rather than one queue item per line.
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+        tail = ""
         try:
-            for line in self._proc.stdout:
-                self._io_queue.put(line)
+            while True:
+                chunk = self._proc.stdout.read(65536)
+                if not chunk:
+                    break
+                *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+                if lines:
+                    self._io_queue.put(lines)
+            tail += decoder.decode(b"", final=True)
+            if tail:
+                self._io_queue.put([tail])
         except Exception:
             pass
         finally:
             self._io_queue.put(None)
 
     def _drain_log_queue(self):
+        # Collect everything queued since the last tick and hand it to the
+        # Text widget as a single insert + see.
+        batch = []
         try:
             while True:
                 item = self._io_queue.get_nowait()
                 if item is None:
+                    self._flush_log_batch(batch)
                     rc = self._proc.poll() if self._proc else None
                     self._log(f"[done] solver exited with code {rc}")
                     self.pb.stop()
                     self.btn_run.configure(state="normal")
                     self._proc = None
                     return
-                self._log(item.rstrip("\n"))
+                batch.extend(line.rstrip("\r") for line in item)
         except queue.Empty:
             pass
+        self._flush_log_batch(batch)
         self.root.after(100, self._drain_log_queue)
 
+    def _flush_log_batch(self, lines):
+        if lines:
+            self.txt_log.insert(tk.END, "\n".join(lines) + "\n")
+            self.txt_log.see(tk.END)
+
     # ---------- Refresh ----------
     def refresh_all(self, select_first=False):
+        self._reindex_shifts()
+        self._reindex_prefs()
         self.refresh_days_cal()
-        self.lst_dates_shifts.delete(0, tk.END)
-        for d in self.case["calendar"]["days"]:
-            self.lst_dates_shifts.insert(tk.END, d)
+        self._fill_day_listbox(self.lst_dates_shifts)
         if select_first and self.case["calendar"]["days"]:
             self.lst_dates_shifts.selection_clear(0, tk.END)
             self.lst_dates_shifts.selection_set(0)
@@ -3412,6 +3715,25 @@ class TestcaseGUI:
         self.load_config_into_ui()
         self._recolor_off_on_days()
 
+    def _schedule_ui(self, *what):
+        """Request 'all' / 'shifts' / 'summary' / 'recolor' refreshes; they run once when Tk goes idle."""
+        self._pending_ui.update(what)
+        if not self._ui_flush_armed:
+            self._ui_flush_armed = True
+            self.root.after_idle(self._flush_ui)
+
+    def _flush_ui(self):
+        pending, self._pending_ui = self._pending_ui, set()
+        self._ui_flush_armed = False
+        if "all" in pending:
+            self.refresh_all(select_first=True)
+        if "shifts" in pending:
+            self.refresh_shift_table()
+        if "summary" in pending:
+            self.render_provider_summary()
+        if "recolor" in pending:
+            self._recolor_off_on_days()
+
     # ---------- Logging ----------
     def _log(self, msg, warn=False):
         if warn:
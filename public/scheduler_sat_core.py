@@ -4,10 +4,13 @@ scheduler_sat_core.py - Real scheduler_sat.py implementation from testcase_gui.p
 Complete advanced medical scheduling with sophisticated constraint system
 """
 
+import os
 import time
 import json
+import heapq
+import itertools
 from ortools.sat.python import cp_model
-from typing import Dict, List, Any, Tuple
+from typing import Dict, FrozenSet, Any, Tuple
 from collections import defaultdict, Counter
 from datetime import datetime, date
 import math
@@ -52,6 +55,10 @@ DEFAULT_CONSTANTS = {
     "objective": {"hard": 1, "soft": 1, "fair": 0}
 }
 
+# Give CP-SAT variables readable names (only useful when dumping/debugging the
+# model); otherwise they are left unnamed to skip the formatting and proto bytes.
+DEBUG_VAR_NAMES = False
+
 def safe_get(d, *keys, default=None):
     """Safe nested dictionary access"""
     cur = d
@@ -73,17 +80,19 @@ def norm_name(name: str) -> str:
     """Normalize name for matching"""
     return ''.join(c for c in (name or '').lower() if c.isalnum())
 
-def infer_allowed_types(shift: Dict[str,Any], provider_types: List[str]) -> set:
-    """Infer allowed provider types for a shift"""
+def infer_allowed_types(shift: Dict[str,Any], provider_types: FrozenSet[str]) -> FrozenSet[str]:
+    """Infer allowed provider types for a shift (pass provider_types as a frozenset built once)"""
+    if not isinstance(provider_types, frozenset):
+        provider_types = frozenset(provider_types)
     allowed = shift.get('allowed_provider_types')
     if allowed:
-        return set(allowed)
+        return frozenset(allowed)
     stype = shift.get('type', '')
     if isinstance(stype, str) and '_' in stype:
         prefix = stype.split('_')[0]
         if prefix in provider_types:
-            return {prefix}
-    return set(provider_types)
+            return frozenset((prefix,))
+    return provider_types
 
 def iso_weekday_name(date_str: str) -> str:
     """Get weekday name from ISO date string"""
@@ -101,6 +110,7 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     print("[SOLVER] Building advanced CP-SAT model with testcase_gui.py logic...")
     
     model = cp_model.CpModel()
+    named = DEBUG_VAR_NAMES
     
     # Extract case data
     calendar = case.get('calendar', {})
@@ -113,12 +123,25 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     
     # Provider analysis
     provider_types = list({p.get('type', 'MD') for p in providers})
+    provider_type_set = frozenset(provider_types)
     print(f"[MODEL] Provider types: {provider_types}")
     
     # Build indexes
     shifts_by_id = {s['id']: s for s in shifts}
     providers_by_name = {p['name']: p for p in providers}
     
+    # Per-day and per-provider fields the constraint loops read repeatedly
+    day_strs = [day if isinstance(day, str) else day.get('date', f'day_{i}') for i, day in enumerate(days)]
+    day_index = {}
+    for i, day_str in enumerate(day_strs):
+        day_index.setdefault(day_str, i)
+    prov_names = [p['name'] for p in providers]
+    # forbidden_days_hard entries as date strings, parallel to prov_names
+    forbidden_hard_strs = [
+        [fd.get('date', '') if isinstance(fd, dict) else str(fd) for fd in p.get('forbidden_days_hard', [])]
+        for p in providers
+    ]
+    
     # Day-shift mapping
     day_shifts = defaultdict(list)
     for shift in shifts:
@@ -138,61 +161,87 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     # Decision variables
     print("[MODEL] Creating decision variables...")
     
-    # Assignment variables: x[provider, shift] = 1 if assigned
+    # Assignment variables: x[provider, shift] = 1 if assigned.
+    # Only compatible pairs get a variable; a missing key means "never assigned".
+    # Providers are walked in list order (not via the allowed-type set, whose
+    # iteration order varies with PYTHONHASHSEED) so variable creation and the
+    # search are reproducible across processes.
+    prov_name_types = [(provider['name'], provider.get('type', 'MD')) for provider in providers]
+    
     x = {}
-    for provider in providers:
-        prov_name = provider['name']
-        prov_type = provider.get('type', 'MD')
-        
-        for shift in shifts:
-            shift_id = shift['id']
-            allowed_types = infer_allowed_types(shift, provider_types)
-            
-            if prov_type in allowed_types:
-                var_name = f"assign_{prov_name}_{shift_id}"
-                x[(prov_name, shift_id)] = model.NewBoolVar(var_name)
-            else:
-                # Provider type not allowed for this shift
-                x[(prov_name, shift_id)] = model.NewIntVar(0, 0, f"disabled_{prov_name}_{shift_id}")
+    shift_vars = defaultdict(list)     # shift id -> its assignment vars
+    provider_shifts = defaultdict(list)  # provider name -> [(shift, var)]
+    for shift in shifts:
+        shift_id = shift['id']
+        allowed = infer_allowed_types(shift, provider_type_set)
+        for prov_name, prov_type in prov_name_types:
+            if prov_type in allowed:
+                var = model.NewBoolVar(f"assign_{prov_name}_{shift_id}" if named else "")
+                x[(prov_name, shift_id)] = var
+                shift_vars[shift_id].append(var)
+                provider_shifts[prov_name].append((shift, var))
     
     print(f"[MODEL] Created {len(x)} assignment variables")
     
-    # Daily work variables: d[provider, day] = 1 if working any shift that day
+    # Daily work variables: d[provider, day] = 1 if working any shift that day.
+    # Days with no assignable shift get a constant 0 that presolve drops.
+    day_vars = defaultdict(list)  # (provider, date) -> assignment vars that day
+    for prov_name, pairs in provider_shifts.items():
+        for shift, var in pairs:
+            day_vars[(prov_name, shift['date'])].append(var)
+    
     d = {}
-    for provider in providers:
-        prov_name = provider['name']
-        for i, day in enumerate(days):
-            day_str = day if isinstance(day, str) else day.get('date', f'day_{i}')
-            d[(prov_name, i)] = model.NewBoolVar(f"daily_{prov_name}_{i}")
+    for prov_name in prov_names:
+        for i, day_str in enumerate(day_strs):
+            if (prov_name, day_str) in day_vars:
+                d[(prov_name, i)] = model.NewBoolVar(f"daily_{prov_name}_{i}" if named else "")
+            else:
+                d[(prov_name, i)] = model.NewConstant(0)
     
     print(f"[MODEL] Created {len(d)} daily work variables")
     
-    # Workload variables: w[provider] = total shifts assigned
+    # Workload variables: w[provider] = total shifts assigned. The min/max
+    # total limits (Constraint 6) are the domain itself, capped by how many
+    # shifts the provider is eligible for.
     w = {}
     for provider in providers:
         prov_name = provider['name']
-        w[prov_name] = model.NewIntVar(0, len(shifts), f"workload_{prov_name}")
+        eligible = len(provider_shifts.get(prov_name, ()))
+        lo = max(0, math.ceil(provider.get('min_total', 0)))
+        hi = min(eligible, math.floor(provider.get('max_total', len(shifts))))
+        if lo <= hi:
+            w[prov_name] = model.NewIntVar(lo, hi, f"workload_{prov_name}" if named else "")
+        else:
+            # Unsatisfiable limits: keep a valid domain and let one bounded
+            # constraint make the model infeasible, rather than handing CP-SAT
+            # an empty domain
+            w[prov_name] = model.NewIntVar(0, eligible, f"workload_{prov_name}" if named else "")
+            model.AddLinearConstraint(w[prov_name], lo, math.floor(provider.get('max_total', len(shifts))))
     
     print(f"[MODEL] Created {len(w)} workload variables")
     
+    # Objective coefficients of the slacks. A slack whose coefficient is 0
+    # is free, so it is not created: an unpenalized unfilled slack just
+    # relaxes "== 1" to "<= 1", and an unpenalized cant-work slack makes the
+    # forbidden-day constraint vacuous.
+    hard_weight = get_num(consts, 'objective', 'hard', default=1.0)
+    unfilled_penalty = int(hard_weight * get_num(consts, 'weights', 'hard', 'slack_unfilled', default=20))
+    cantwork_penalty = int(hard_weight * get_num(consts, 'weights', 'hard', 'slack_cant_work', default=20))
+    
     # Slack variables for constraint violations
     slack = {}
     
     # Unfilled shift slack
-    for shift in shifts:
-        shift_id = shift['id']
-        slack[('unfilled', shift_id)] = model.NewBoolVar(f"slack_unfilled_{shift_id}")
+    if unfilled_penalty:
+        for shift in shifts:
+            shift_id = shift['id']
+            slack[('unfilled', shift_id)] = model.NewBoolVar(f"slack_unfilled_{shift_id}" if named else "")
     
     # Can't work slack (provider assigned when forbidden)
-    for provider in providers:
-        prov_name = provider['name']
-        forbidden_hard = provider.get('forbidden_days_hard', [])
-        for forbidden_day in forbidden_hard:
-            if isinstance(forbidden_day, dict):
-                day_str = forbidden_day.get('date', '')
-            else:
-                day_str = str(forbidden_day)
-            slack[('cant_work', prov_name, day_str)] = model.NewBoolVar(f"slack_cantwork_{prov_name}_{day_str}")
+    if cantwork_penalty:
+        for prov_name, forbidden_days in zip(prov_names, forbidden_hard_strs):
+            for day_str in forbidden_days:
+                slack[('cant_work', prov_name, day_str)] = model.NewBoolVar(f"slack_cantwork_{prov_name}_{day_str}" if named else "")
     
     print(f"[MODEL] Created {len(slack)} slack variables")
     
@@ -202,64 +251,43 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     # Constraint 1: Each shift assigned to exactly one provider (or slack)
     for shift in shifts:
         shift_id = shift['id']
-        assigned_vars = [x[(prov['name'], shift_id)] for prov in providers if (prov['name'], shift_id) in x]
-        slack_var = slack[('unfilled', shift_id)]
-        model.Add(sum(assigned_vars) + slack_var == 1)
+        assigned_vars = shift_vars.get(shift_id, [])
+        slack_var = slack.get(('unfilled', shift_id))
+        if slack_var is not None:
+            model.Add(cp_model.LinearExpr.Sum(assigned_vars + [slack_var]) == 1)
+        elif assigned_vars:
+            model.Add(cp_model.LinearExpr.Sum(assigned_vars) <= 1)
     
     print("[MODEL] Added shift assignment constraints")
     
-    # Constraint 2: Daily work consistency
-    for provider in providers:
-        prov_name = provider['name']
-        for i, day in enumerate(days):
-            day_str = day if isinstance(day, str) else day.get('date', f'day_{i}')
-            # Find all shifts on this day for this provider
-            day_shift_vars = []
-            for shift in day_shifts.get(day_str, []):
-                if (prov_name, shift['id']) in x:
-                    day_shift_vars.append(x[(prov_name, shift['id'])])
-            
-            if day_shift_vars:
-                # d[provider, day] = 1 iff any shift assigned that day
-                for day_var in day_shift_vars:
-                    model.Add(d[(prov_name, i)] >= day_var)
-                model.Add(d[(prov_name, i)] <= sum(day_shift_vars))
+    # Constraint 2: Daily work consistency, d[provider, day] = max(shift vars that day)
+    for prov_name in prov_names:
+        for i, day_str in enumerate(day_strs):
+            day_shift_vars = day_vars.get((prov_name, day_str))
+            if not day_shift_vars:
+                continue  # d is the constant 0
+            if len(day_shift_vars) == 1:
+                model.Add(d[(prov_name, i)] == day_shift_vars[0])
             else:
-                model.Add(d[(prov_name, i)] == 0)
+                model.AddMaxEquality(d[(prov_name, i)], day_shift_vars)
     
     print("[MODEL] Added daily consistency constraints")
     
     # Constraint 3: Workload calculation
-    for provider in providers:
-        prov_name = provider['name']
-        assigned_shifts = [x[(prov_name, shift['id'])] for shift in shifts if (prov_name, shift['id']) in x]
+    for prov_name in prov_names:
+        assigned_shifts = [var for _, var in provider_shifts.get(prov_name, ())]
         if assigned_shifts:
-            model.Add(w[prov_name] == sum(assigned_shifts))
+            model.Add(w[prov_name] == cp_model.LinearExpr.Sum(assigned_shifts))
         else:
             model.Add(w[prov_name] == 0)
     
     print("[MODEL] Added workload constraints")
     
-    # Constraint 4: Hard forbidden days
-    for provider in providers:
-        prov_name = provider['name']
-        forbidden_hard = provider.get('forbidden_days_hard', [])
-        
-        for forbidden_day in forbidden_hard:
-            if isinstance(forbidden_day, dict):
-                day_str = forbidden_day.get('date', '')
-            else:
-                day_str = str(forbidden_day)
-                
-            # Find day index
-            day_idx = None
-            for i, day in enumerate(days):
-                check_day = day if isinstance(day, str) else day.get('date', f'day_{i}')
-                if check_day == day_str:
-                    day_idx = i
-                    break
-                    
-            if day_idx is not None and (prov_name, day_idx) in d:
+    # Constraint 4: Hard forbidden days (only while violating them costs something)
+    for prov_name, forbidden_days in zip(prov_names, forbidden_hard_strs):
+        for day_str in forbidden_days:
+            day_idx = day_index.get(day_str)
+            if cantwork_penalty and day_idx is not None and (prov_name, day_idx) in d:
                 slack_var = slack[('cant_work', prov_name, day_str)]
                 model.Add(d[(prov_name, day_idx)] <= slack_var)
     
@@ -271,53 +299,44 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
         max_consec = provider.get('max_consecutive_days', 31)
         
         if max_consec < len(days):
-            for start_day in range(len(days) - max_consec):
-                consec_vars = [d[(prov_name, start_day + j)] for j in range(max_consec + 1)]
-                model.Add(sum(consec_vars) <= max_consec)
+            # Running totals of worked days: each window of max_consec+1 days is
+            # then one two-term difference instead of a (max_consec+1)-term sum.
+            worked = []
+            for i in range(len(days)):
+                cum = model.NewIntVar(0, i + 1, f"worked_{prov_name}_{i}" if named else "")
+                model.Add(cum == (worked[-1] if worked else 0) + d[(prov_name, i)])
+                worked.append(cum)
+            for end_day in range(max_consec, len(days)):
+                before = end_day - max_consec - 1
+                model.Add(worked[end_day] - (worked[before] if before >= 0 else 0) <= max_consec)
     
     print("[MODEL] Added consecutive day constraints")
     
-    # Constraint 6: Min/Max total limits
-    for provider in providers:
-        prov_name = provider['name']
-        min_total = provider.get('min_total', 0)
-        max_total = provider.get('max_total', len(shifts))
-        
-        if min_total > 0:
-            model.Add(w[prov_name] >= min_total)
-        if max_total < len(shifts):
-            model.Add(w[prov_name] <= max_total)
+    # Constraint 6: Min/Max total limits are encoded in the workload domains above
     
-    print("[MODEL] Added min/max total constraints")
+    print("[MODEL] Min/max total limits set as workload domains")
     
     # Phase 2: Advanced objective function
     print("[MODEL] Building advanced objective function...")
     
-    objective_terms = []
+    # Parallel variable/coefficient lists, handed to CP-SAT as one weighted sum
+    obj_vars = []
+    obj_coefs = []
     
-    # Hard constraint penalties
-    hard_weight = get_num(consts, 'objective', 'hard', default=1.0)
+    # Hard constraint penalties (hard_weight and the slack penalties are computed above)
     
     # Unfilled shifts penalty
-    unfilled_weight = get_num(consts, 'weights', 'hard', 'slack_unfilled', default=20)
     for shift in shifts:
-        shift_id = shift['id']
-        penalty = int(hard_weight * unfilled_weight)
-        objective_terms.append(slack[('unfilled', shift_id)] * penalty)
+        key = ('unfilled', shift['id'])
+        if key in slack:
+            obj_vars.append(slack[key]); obj_coefs.append(unfilled_penalty)
     
     # Can't work penalty
-    cantwork_weight = get_num(consts, 'weights', 'hard', 'slack_cant_work', default=20)
-    for provider in providers:
-        prov_name = provider['name']
-        forbidden_hard = provider.get('forbidden_days_hard', [])
-        for forbidden_day in forbidden_hard:
-            if isinstance(forbidden_day, dict):
-                day_str = forbidden_day.get('date', '')
-            else:
-                day_str = str(forbidden_day)
-            if ('cant_work', prov_name, day_str) in slack:
-                penalty = int(hard_weight * cantwork_weight)
-                objective_terms.append(slack[('cant_work', prov_name, day_str)] * penalty)
+    for prov_name, forbidden_days in zip(prov_names, forbidden_hard_strs):
+        for day_str in forbidden_days:
+            key = ('cant_work', prov_name, day_str)
+            if key in slack:
+                obj_vars.append(slack[key]); obj_coefs.append(cantwork_penalty)
     
     # Soft preferences
     soft_weight = get_num(consts, 'objective', 'soft', default=1.0)
@@ -327,14 +346,15 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
     for provider in providers:
         prov_name = provider['name']
         type_prefs = provider.get('type_pref', {})
+        if not type_prefs:
+            continue
         
-        for shift in shifts:
-            shift_id = shift['id']
+        for shift, var in provider_shifts.get(prov_name, ()):
             shift_type = shift.get('type', '')
-            if (prov_name, shift_id) in x and shift_type in type_prefs:
+            if shift_type in type_prefs:
                 pref_score = type_prefs[shift_type]
                 bonus = int(soft_weight * type_pref_weight * pref_score * 100)
-                objective_terms.append(x[(prov_name, shift_id)] * bonus)
+                obj_vars.append(var); obj_coefs.append(bonus)
     
     # Workload balancing (fairness)
     fair_weight = get_num(consts, 'objective', 'fair', default=0.0)
@@ -345,22 +365,22 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
             for provider in providers:
                 prov_name = provider['name']
                 # Penalty for deviation from average
-                deviation_var = model.NewIntVar(-len(shifts), len(shifts), f"deviation_{prov_name}")
+                deviation_var = model.NewIntVar(-len(shifts), len(shifts), f"deviation_{prov_name}" if named else "")
                 model.Add(deviation_var == w[prov_name] - avg_workload)
                 # Absolute deviation approximation
-                abs_dev = model.NewIntVar(0, len(shifts), f"abs_dev_{prov_name}")
+                abs_dev = model.NewIntVar(0, len(shifts), f"abs_dev_{prov_name}" if named else "")
                 model.AddAbsEquality(abs_dev, deviation_var)
                 penalty = int(fair_weight * unfair_weight)
-                objective_terms.append(abs_dev * penalty)
+                obj_vars.append(abs_dev); obj_coefs.append(penalty)
     
-    print(f"[MODEL] Created objective with {len(objective_terms)} terms")
+    print(f"[MODEL] Created objective with {len(obj_vars)} terms")
     
     # Set objective to minimize penalties and maximize bonuses
-    if objective_terms:
-        model.Minimize(sum(objective_terms))
+    if obj_vars:
+        model.Minimize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coefs))
     else:
         # Fallback objective
-        model.Minimize(sum(slack[('unfilled', s['id'])] for s in shifts))
+        model.Minimize(cp_model.LinearExpr.Sum([slack[('unfilled', s['id'])] for s in shifts if ('unfilled', s['id']) in slack]))
     
     print("[MODEL] Model building complete")
     
@@ -382,6 +402,51 @@ def build_model(consts: Dict[str,Any], case: Dict[str,Any]) -> Dict[str,Any]:
         }
     }
 
+def add_greedy_hint(ctx: Dict[str,Any]) -> int:
+    """
+    Hint a greedy assignment so CP-SAT starts from a full solution instead of cold.
+    Shifts are taken in date order; each goes to the eligible provider who is
+    not yet working that day, is not hard-forbidden on it, and has the lowest
+    load so far (ties by name). Returns the number of hinted assignments.
+    """
+    model = ctx['model']
+    x = ctx['variables']['assignments']
+    w = ctx['variables']['workload']
+    slack = ctx['variables']['slack']
+    providers_by_name = ctx['data']['providers_by_name']
+    
+    candidates = defaultdict(list)  # shift id -> eligible provider names
+    for prov_name, shift_id in x:
+        candidates[shift_id].append(prov_name)
+    forbidden = {
+        name: {fd.get('date', '') if isinstance(fd, dict) else str(fd) for fd in p.get('forbidden_days_hard', [])}
+        for name, p in providers_by_name.items()
+    }
+    
+    load = Counter()
+    busy = set()  # (provider, date) already hinted
+    chosen = set()
+    for shift in sorted(ctx['data']['shifts'], key=lambda s: s.get('date', '')):
+        shift_id, day = shift['id'], shift.get('date', '')
+        eligible = [n for n in candidates.get(shift_id, ())
+                    if (n, day) not in busy and day not in forbidden.get(n, ())]
+        if not eligible:
+            continue
+        best = min(eligible, key=lambda n: (load[n], n))
+        chosen.add((best, shift_id))
+        busy.add((best, day))
+        load[best] += 1
+    
+    for key, var in x.items():
+        model.AddHint(var, 1 if key in chosen else 0)
+    for prov_name, var in w.items():
+        model.AddHint(var, load[prov_name])
+    filled = {shift_id for _, shift_id in chosen}
+    for key, var in slack.items():
+        if key[0] == 'unfilled':
+            model.AddHint(var, 0 if key[1] in filled else 1)
+    return len(chosen)
+
 class KeepTopK(cp_model.CpSolverSolutionCallback):
     """Solution callback to keep top K solutions"""
     
@@ -389,7 +454,15 @@ class KeepTopK(cp_model.CpSolverSolutionCallback):
         cp_model.CpSolverSolutionCallback.__init__(self)
         self.variables = variables
         self.K = K
-        self.solutions = []
+        # Bounded heap of (-objective, -arrival, solution): the root is the
+        # worst kept solution (latest among ties), so each incumbent costs O(log K)
+        self._heap = []
+        self._arrivals = itertools.count()
+        
+    @property
+    def solutions(self):
+        """Kept (objective, solution) pairs, best first (earliest first among ties)."""
+        return [(-neg_obj, solution) for neg_obj, _, solution in sorted(self._heap, reverse=True)]
         
     def on_solution_callback(self):
         current_obj = self.ObjectiveValue()
@@ -401,10 +474,11 @@ class KeepTopK(cp_model.CpSolverSolutionCallback):
                 solution[key] = self.Value(var)
                 
         # Keep top K solutions
-        self.solutions.append((current_obj, solution))
-        self.solutions.sort(key=lambda x: x[0])  # Sort by objective
-        if len(self.solutions) > self.K:
-            self.solutions = self.solutions[:self.K]
+        entry = (-current_obj, -next(self._arrivals), solution)
+        if len(self._heap) < self.K:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heappushpop(self._heap, entry)
 
 class AssignmentPoolCollector(cp_model.CpSolverSolutionCallback):
     """Collect diverse assignment solutions"""
@@ -414,26 +488,25 @@ class AssignmentPoolCollector(cp_model.CpSolverSolutionCallback):
         self.variables = variables
         self.data = data
         self.solutions = []
-        self.vectors = []
+        # Fixed variable order for the per-solution 0/1 vectors
+        self._keys = list(variables['assignments'].keys())
+        self._vars = list(variables['assignments'].values())
         
-    def on_solution_callback(self):
-        # Create assignment vector for diversity calculation
-        assignments = {}
-        vector = []
+    @property
+    def vectors(self):
+        return [sol['vector'] for sol in self.solutions]
         
-        for (prov, shift_id), var in self.variables['assignments'].items():
-            if self.Value(var) > 0:
-                assignments[(prov, shift_id)] = 1
-                vector.append(1)
-            else:
-                vector.append(0)
+    def on_solution_callback(self):
+        # Assignment vector for diversity calculation: one byte (0/1) per
+        # assignment variable, hashable and cheap to compare
+        vector = bytes(1 if self.Value(var) > 0 else 0 for var in self._vars)
+        assignments = {key: 1 for key, bit in zip(self._keys, vector) if bit}
                 
         self.solutions.append({
             'objective': self.ObjectiveValue(),
             'assignments': assignments,
-            'vector': tuple(vector)
+            'vector': vector
         })
-        self.vectors.append(tuple(vector))
 
 def solve_two_phase(consts, case, ctx, K=5, seed=None):
     """
@@ -447,6 +520,8 @@ def solve_two_phase(consts, case, ctx, K=5, seed=None):
     # Build the model
     ctx = build_model(consts, case)
     model = ctx['model']
+    hinted = add_greedy_hint(ctx)
+    print(f"[SOLVER] Warm start: hinted {hinted} greedy assignments")
     variables = ctx['variables']
     data = ctx['data']
     
@@ -455,24 +530,40 @@ def solve_two_phase(consts, case, ctx, K=5, seed=None):
     
     # Extract solver parameters
     max_time = get_num(consts, 'solver', 'max_time_in_seconds', default=120.0)
-    num_threads = int(get_num(consts, 'solver', 'num_threads', default=8))
+    # 0/unset -> one worker per core, capped at the 16 CP-SAT's portfolio is tuned for
+    requested_threads = int(get_num(consts, 'solver', 'num_threads', default=0))
+    num_threads = requested_threads if requested_threads > 0 else min(16, os.cpu_count() or 8)
     phase1_fraction = get_num(consts, 'solver', 'phase1_fraction', default=0.4)
     relative_gap = get_num(consts, 'solver', 'relative_gap', default=0.00001)
+    # Only Phase 1 runs here, so its share of the budget is the solver's time limit
+    phase1_time = max_time * phase1_fraction
     
-    solver.parameters.max_time_in_seconds = max_time
+    solver.parameters.max_time_in_seconds = phase1_time
     solver.parameters.num_search_workers = num_threads
     solver.parameters.relative_gap_limit = relative_gap
-    solver.parameters.log_search_progress = True
-    
-    print(f"[SOLVER] Configured: {max_time}s timeout, {num_threads} threads, {relative_gap} gap")
+    # search logging is serialized to stderr and slows small models; opt in only
+    solver.parameters.log_search_progress = bool(safe_get(consts, 'solver', 'log_search_progress', default=False))
+    # LP relaxation at level 2 pays off on assignment/coverage models; presolve stays on
+    solver.parameters.linearization_level = int(get_num(consts, 'solver', 'linearization_level', default=2))
+    solver.parameters.cp_model_presolve = bool(get_num(consts, 'solver', 'presolve', default=1))
+    solver.parameters.use_phase_saving = True
+    if safe_get(consts, 'solver', 'fixed_search', default=False):
+        # Deterministic date-ordered branching for the fixed-search worker; LNS
+        # workers keep running alongside it
+        shifts_by_id = ctx['data']['shifts_by_id']
+        ordered = sorted(variables['assignments'].items(),
+                         key=lambda kv: shifts_by_id[kv[0][1]].get('date', ''))
+        model.AddDecisionStrategy([var for _, var in ordered],
+                                  cp_model.CHOOSE_FIRST, cp_model.SELECT_MIN_VALUE)
+        solver.parameters.search_branching = cp_model.FIXED_SEARCH
+    
+    print(f"[SOLVER] Configured: {phase1_time}s of {max_time}s budget, {num_threads} threads, {relative_gap} gap")
     
     if seed is not None:
         solver.parameters.random_seed = seed
     
     # Phase 1: Initial optimization
     print("[SOLVER] Phase 1: Finding initial optimal solution...")
-    phase1_time = max_time * phase1_fraction
-    solver.parameters.max_time_in_seconds = phase1_time
     
     # Use KeepTopK callback for solution collection
     callback = KeepTopK(variables, K=K)
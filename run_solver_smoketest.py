@@ -11,8 +11,7 @@ try:
     days = [(start_day + timedelta(days=i)).isoformat() for i in range(30)]
 
     shifts = []
-    for i in range(5):
-        shift_date = (start_day + timedelta(days=i)).isoformat()
+    for i, shift_date in enumerate(days[:5]):
         shifts.append({
             'id': f's{i}',
             'date': shift_date,
@@ -34,7 +33,8 @@ try:
         'run': {'k': 1, 'seed': 1}
     }
 
-    res = solver._build_and_solve_model(case['constants'], case['calendar'], case['shifts'], case['providers'], case['run'], 'test-run')
+    res = solver._build_and_solve_model(case['constants'], case['calendar'], case['shifts'], case['providers'], case['run'], 'test-run',
+                                      shifts_by_date=solver._shift_indices(case['shifts']))
 
     print('Status:', res.get('solver_status'))
     print('Solutions found:', res.get('solutions_found'))
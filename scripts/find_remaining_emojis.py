@@ -4,10 +4,17 @@ import re
 ROOT = os.path.dirname(os.path.dirname(__file__))
 EXTS = {'.md', '.py', '.js', '.mjs', '.ts', '.tsx', '.json', '.txt', '.sh', '.bat'}
 EMOJI_PATTERN = re.compile(r'✅|❌|⚠️|⚠|🚀|✨|🎯|⏳|⏰|⏱|🔐|🔒|🔧|🛠️|🛠|📝|💡|🔍|🔑|🗑️|🗑|📦|📋|🎉|⚡|📁')
+# Same alternation over the UTF-8 bytes: one C-level scan per file decides
+# whether it needs the line-by-line pass at all.
+EMOJI_BYTES = re.compile(EMOJI_PATTERN.pattern.encode('utf-8'))
+IGNORED_DIRS = ['.git', 'node_modules', '__pycache__']
 
 matches = {}
 for dirpath, dirnames, filenames in os.walk(ROOT):
-    if any(ignored in dirpath for ignored in ['.git', 'node_modules', '__pycache__']):
+    # prune instead of skipping after the fact, so ignored trees are never walked
+    dirnames[:] = [d for d in dirnames
+                   if not any(ignored in os.path.join(dirpath, d) for ignored in IGNORED_DIRS)]
+    if any(ignored in dirpath for ignored in IGNORED_DIRS):
         continue
     for fn in filenames:
         _, ext = os.path.splitext(fn)
@@ -17,6 +24,9 @@ for dirpath, dirnames, filenames in os.walk(ROOT):
         if full.endswith('.bak'):
             continue
         try:
+            with open(full, 'rb') as f:
+                if not EMOJI_BYTES.search(f.read()):
+                    continue
             with open(full, 'r', encoding='utf-8') as f:
                 for i, line in enumerate(f, 1):
                     if EMOJI_PATTERN.search(line):
@@ -1,65 +1,113 @@
 #!/usr/bin/env python3
 """
 Small repo-wide emoji replacer. Scans files (text files) and replaces emoji glyphs with bracketed labels.
-It will create a .bak backup for each file changed.
-Usage: python scripts/replace_emojis.py
+Changed files are rewritten atomically; a .bak backup of each is kept unless
+the repo is under git (override with --backup / --no-backup).
+Usage: python scripts/replace_emojis.py [--backup | --no-backup]
 """
+import argparse
 import os
 import re
+import shutil
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 
 ROOT = os.path.dirname(os.path.dirname(__file__))
 # file extensions to scan
 EXTS = {'.md', '.py', '.js', '.mjs', '.ts', '.tsx', '.json', '.txt', '.sh', '.bat'}
+# str.endswith takes a tuple and tests every suffix in one C call
+EXTS_TUPLE = tuple(sorted(EXTS))
+# directory names never descended into
+SKIP = {'.git', 'node_modules', '__pycache__', '.venv', 'dist', 'build'}
 
-# mapping regex -> replacement
-REPLACEMENTS = [
-    (re.compile(r'[Done]'), '[Done]'),
-    (re.compile(r'[Error]'), '[Error]'),
-    (re.compile(r'[Warning]|[Warning]'), '[Warning]'),
-    (re.compile(r'[Feature]|[Feature]'), '[Feature]'),
-    (re.compile(r'[Goal]'), '[Goal]'),
-    (re.compile(r'[Progressing]|[Progressing]|[Progressing]'), '[Progressing]'),
-    (re.compile(r'[Secure]|[Secure]'), '[Secure]'),
-    (re.compile(r'[Maintenance]|[Maintenance]|[Maintenance]'), '[Maintenance]'),
-    (re.compile(r'[Note]|[Note]'), '[Note]'),
-    (re.compile(r'[Info]'), '[Info]'),
-    (re.compile(r'[Key]'), '[Key]'),
-    (re.compile(r'[Done]|[Done]'), '[Done]'),
-    (re.compile(r'[Package]'), '[Package]'),
-    (re.compile(r'[Info]'), '[Info]'),
-    (re.compile(r'[Done]'), '[Done]'),
-    (re.compile(r'[Info]'), '[Info]'),
-    (re.compile(r'[Files]'), '[Files]'),
+# pattern -> replacement; every replacement is ASCII, so no pattern can
+# match another's output and one fused pass equals applying them in turn
+PATTERNS = [
+    (r'✅', '[Done]'),
+    (r'❌', '[Error]'),
+    (r'⚠️|⚠', '[Warning]'),
+    (r'🚀|✨', '[Feature]'),
+    (r'🎯', '[Goal]'),
+    (r'⏳|⏰|⏱', '[Progressing]'),
+    (r'🔐|🔒', '[Secure]'),
+    (r'🔧|🛠️|🛠', '[Maintenance]'),
+    (r'📝|💡', '[Note]'),
+    (r'🔍', '[Info]'),
+    (r'🔑', '[Key]'),
+    (r'🗑️|🗑', '[Done]'),
+    (r'📦', '[Package]'),
+    (r'📋', '[Info]'),
+    (r'🎉', '[Done]'),
+    (r'⚡', '[Info]'),
+    (r'📁', '[Files]'),
 ]
 
-changed_files = []
+# one alternation regex so each file is scanned once; lastindex picks the replacement
+MASTER = re.compile('|'.join(f'({p})' for p, _ in PATTERNS))
+REPLS = [r for _, r in PATTERNS]
+# Same alternation over the UTF-8 bytes: files without a candidate are
+# rejected before any decoding or substitution. Any text match is also a
+# match on its encoded bytes, so the filter never drops a file to rewrite.
+MASTER_BYTES = re.compile(MASTER.pattern.encode('utf-8'))
 
-for dirpath, dirnames, filenames in os.walk(ROOT):
-    # skip .git and node_modules and __pycache__ and public/local-solver-package (we still want public changes though)
-    if any(p in dirpath for p in ['.git', 'node_modules', '__pycache__']):
-        continue
-    for fn in filenames:
-        _, ext = os.path.splitext(fn)
-        if ext.lower() not in EXTS:
-            continue
-        full = os.path.join(dirpath, fn)
-        try:
-            with open(full, 'r', encoding='utf-8') as f:
-                s = f.read()
-        except Exception:
-            continue
-        original = s
-        for pat, repl in REPLACEMENTS:
-            s = pat.sub(repl, s)
-        if s != original:
-            bak = full + '.bak'
-            with open(bak, 'w', encoding='utf-8') as f:
-                f.write(original)
-            with open(full, 'w', encoding='utf-8') as f:
-                f.write(s)
-            changed_files.append(full)
+def _replace(m):
+    return REPLS[m.lastindex - 1]
 
-print('Changed files:')
-for p in changed_files:
-    print(p)
-print('Total changed:', len(changed_files))
+
+def process(full, backup=False):
+    """Rewrite one file in place (optionally keeping a .bak); return its path if it changed."""
+    try:
+        with open(full, 'rb') as f:
+            raw = f.read()
+        if not MASTER_BYTES.search(raw):
+            return None
+        original = raw.decode('utf-8')
+    except Exception:
+        return None
+    s = MASTER.sub(_replace, original)
+    if s == original:
+        return None
+    if backup:
+        shutil.copyfile(full, full + '.bak')
+    tmp = full + '.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(s)
+        # keep the original permissions (e.g. the exec bit on .sh scripts)
+        shutil.copymode(full, tmp)
+        os.replace(tmp, full)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return full
+
+
+def iter_files(root):
+    """Yield paths of files with a scanned extension, skipping SKIP directories."""
+    with os.scandir(root) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                if e.name not in SKIP:
+                    yield from iter_files(e.path)
+            elif e.is_file(follow_symlinks=False) and e.name.lower().endswith(EXTS_TUPLE):
+                yield e.path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replace emoji glyphs with bracketed labels.')
+    parser.add_argument('--backup', dest='backup', action='store_true', default=None,
+                        help='keep a .bak copy of every changed file')
+    parser.add_argument('--no-backup', dest='backup', action='store_false',
+                        help='do not write .bak copies')
+    args = parser.parse_args()
+    # git already keeps the originals, so backups default off inside a checkout
+    backup = args.backup if args.backup is not None else not os.path.isdir(os.path.join(ROOT, '.git'))
+
+    # files are independent; spread read/scan/write over all cores
+    with ProcessPoolExecutor() as ex:
+        changed_files = [p for p in ex.map(partial(process, backup=backup), list(iter_files(ROOT)), chunksize=32) if p]
+
+    print('Changed files:')
+    for p in changed_files:
+        print(p)
+    print('Total changed:', len(changed_files))
@@ -3,6 +3,11 @@ import uuid
 from pathlib import Path
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import the service class
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'public' / 'local-solver-package'))
 try:
@@ -17,27 +22,27 @@ if not raw_path.exists():
     print('No payload at', raw_path)
     raise SystemExit(1)
 
-with open(raw_path, 'r', encoding='utf-8') as f:
-    case = json.load(f)
+# json.loads accepts bytes too, so either parser reads the file in one go
+case = (orjson.loads if orjson is not None else json.loads)(raw_path.read_bytes())
 
 solver = AdvancedSchedulingSolver()
 
 print('Before sanitize calendar.days =', case.get('calendar', {}).get('days'))
 
-# Run sanitizer
-san = solver._sanitize_calendar(case.get('calendar', {}))
-case['calendar'] = san
-
-# Ensure shifts present
-case['calendar'] = solver._ensure_shifts_in_calendar(case.get('calendar', {}), case.get('shifts', []))
+# Sanitize calendar days and ensure shift dates are present in one pass
+case['calendar'] = solver._sanitize_and_ensure(case.get('calendar', {}), case.get('shifts', []))
 
 run_id = str(uuid.uuid4())
 run_dir = Path('public') / 'local-solver-package' / 'solver_output' / run_id
 run_dir.mkdir(parents=True, exist_ok=True)
 
 out_file = run_dir / 'input_case.json'
-with open(out_file, 'w', encoding='utf-8') as f:
-    json.dump(case, f, indent=2)
+if orjson is not None:
+    with open(out_file, 'wb') as f:
+        f.write(orjson.dumps(case, option=orjson.OPT_INDENT_2))
+else:
+    with open(out_file, 'w', encoding='utf-8') as f:
+        json.dump(case, f, indent=2)
 
 print('Wrote sanitized input_case.json to', out_file)
 print('After sanitize calendar.days =', case.get('calendar', {}).get('days'))
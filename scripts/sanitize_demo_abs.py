@@ -25,12 +25,8 @@ solver = AdvancedSchedulingSolver()
 
 print('Before sanitize calendar.days =', case.get('calendar', {}).get('days'))
 
-# Run sanitizer
-san = solver._sanitize_calendar(case.get('calendar', {}))
-case['calendar'] = san
-
-# Ensure shifts present
-case['calendar'] = solver._ensure_shifts_in_calendar(case.get('calendar', {}), case.get('shifts', []))
+# Sanitize calendar days and ensure shift dates are present in one pass
+case['calendar'] = solver._sanitize_and_ensure(case.get('calendar', {}), case.get('shifts', []))
 
 run_id = str(uuid.uuid4())
 run_dir = repo_root / 'public' / 'local-solver-package' / 'solver_output' / run_id
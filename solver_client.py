@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP and JSON helpers for the local solver test scripts
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:  # the JSON helpers still work without requests
+    requests = None
+
+# One keep-alive connection pool for every call to the local solver; connect
+# failures (service still starting) are retried with a short backoff
+SESSION = None
+if requests is not None:
+    SESSION = requests.Session()
+    SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                         max_retries=Retry(total=3, backoff_factor=0.1)))
+
+
+def encode_body(obj) -> bytes:
+    """Serialize a request payload once (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def decode_body(data):
+    """Parse JSON bytes or text (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json(path):
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return decode_body(f.read())
@@ -20,14 +20,20 @@ from pathlib import Path
 from typing import Dict, Any, List
 import subprocess
 import traceback
+from collections import Counter
 
 try:
-    from flask import Flask, request, jsonify
+    from flask import Flask, Response, request, jsonify
     from flask_cors import CORS
 except ImportError:
     print("Please install required packages: pip install flask flask-cors")
     sys.exit(1)
 
+try:
+    import orjson  # optional: much faster indented dumps for large cases
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,6 +41,29 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Allow requests from the web app
 
+def write_json(path: Path, obj: Any) -> None:
+    """Write obj as indented JSON, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # e.g. non-str keys; the stdlib encoder below handles them
+        else:
+            with open(path, 'wb') as f:
+                f.write(data)
+            return
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=2)
+
+def json_response(obj: Any, status: int = 200):
+    """Serialize an API response, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+        except TypeError:
+            pass  # e.g. non-str keys; jsonify handles them
+    return jsonify(obj), status
+
 class SchedulingSolver:
     def __init__(self):
         self.output_dir = Path("solver_output")
@@ -53,8 +82,7 @@ class SchedulingSolver:
             
             # Save input case
             case_file = run_output_dir / "input_case.json"
-            with open(case_file, 'w') as f:
-                json.dump(case_data, f, indent=2)
+            write_json(case_file, case_data)
             
             logger.info(f"Starting optimization run: {run_id}")
             
@@ -64,8 +92,7 @@ class SchedulingSolver:
             
             # Save results
             result_file = run_output_dir / "results.json"
-            with open(result_file, 'w') as f:
-                json.dump(result, f, indent=2)
+            write_json(result_file, result)
                 
             logger.info(f"Optimization completed: {run_id}")
             
@@ -77,12 +104,13 @@ class SchedulingSolver:
             }
             
         except Exception as e:
+            tb = traceback.format_exc()  # format once; logged and returned
             logger.error(f"Solver error: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(tb)
             return {
                 "status": "error",
                 "message": str(e),
-                "traceback": traceback.format_exc()
+                "traceback": tb
             }
     
     def _run_simulation(self, case_data: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
@@ -93,15 +121,25 @@ class SchedulingSolver:
         providers = case_data.get('providers', [])
         calendar_days = case_data.get('calendar', {}).get('days', [])
         
+        # Index of the first provider of each type, built once so each shift
+        # only looks at its allowed types instead of scanning every provider
+        first_of_type: Dict[str, int] = {}
+        for idx, p in enumerate(providers):
+            first_of_type.setdefault(p.get('type', 'MD'), idx)
+        
         # Create mock assignments (replace with real optimization)
         assignments = []
         for shift in shifts:
-            # Simple assignment logic (replace with your complex constraints)
-            eligible_providers = [p for p in providers if not shift.get('allowed_provider_types') or 
-                                p.get('type', 'MD') in shift.get('allowed_provider_types', [])]
+            # Simple assignment logic (replace with your complex constraints):
+            # the first provider, in input order, whose type the shift allows
+            allowed = shift.get('allowed_provider_types')
+            if not allowed:
+                candidate = 0 if providers else None
+            else:
+                candidate = min((first_of_type[t] for t in allowed if t in first_of_type), default=None)
             
-            if eligible_providers:
-                assigned_provider = eligible_providers[0]  # Simple assignment
+            if candidate is not None:
+                assigned_provider = providers[candidate]
                 assignments.append({
                     "shift_id": shift['id'],
                     "provider_id": assigned_provider.get('id', assigned_provider.get('name', 'unknown')),
@@ -113,15 +151,8 @@ class SchedulingSolver:
                 })
         
         # Generate summary statistics
-        provider_workload = {}
-        for assignment in assignments:
-            provider_name = assignment['provider_name']
-            provider_workload[provider_name] = provider_workload.get(provider_name, 0) + 1
-        
-        shift_coverage = {}
-        for assignment in assignments:
-            shift_type = assignment['shift_type']
-            shift_coverage[shift_type] = shift_coverage.get(shift_type, 0) + 1
+        provider_workload = dict(Counter(a['provider_name'] for a in assignments))
+        shift_coverage = dict(Counter(a['shift_type'] for a in assignments))
         
         return {
             "assignments": assignments,
@@ -148,7 +179,18 @@ solver = SchedulingSolver()
 def solve_schedule():
     """API endpoint for solving scheduling problems"""
     try:
-        case_data = request.get_json()
+        # Parse the raw body once; skips get_json's buffering and caching.
+        # Like get_json, only application/json bodies are read.
+        raw = request.get_data(cache=False) if request.is_json else b''
+        try:
+            if not raw:
+                case_data = None
+            elif orjson is not None:
+                case_data = orjson.loads(raw)
+            else:
+                case_data = json.loads(raw)
+        except ValueError as e:  # orjson.JSONDecodeError / json.JSONDecodeError
+            return jsonify({"status": "error", "message": f"Invalid JSON: {e}"}), 400
         
         if not case_data:
             return jsonify({"status": "error", "message": "No case data provided"}), 400
@@ -156,9 +198,9 @@ def solve_schedule():
         result = solver.solve(case_data)
         
         if result["status"] == "error":
-            return jsonify(result), 500
+            return json_response(result, 500)
         
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
         logger.error(f"API error: {str(e)}")
@@ -204,8 +246,18 @@ if __name__ == '__main__':
     print("  GET  /output/<run_id> - Get output files")
     print("\nPress Ctrl+C to stop the service")
     
-    app.run(
-        host='0.0.0.0',  # Allow connections from web app
-        port=8000,
-        debug=True
-    )
+    # waitress serves /solve requests from a thread pool instead of the
+    # single-threaded, auto-reloading Werkzeug debug server
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed; falling back to Flask's threaded server")
+        app.run(
+            host='0.0.0.0',  # Allow connections from web app
+            port=8000,
+            debug=os.environ.get('FLASK_DEBUG') == '1',  # opt-in tracebacks only
+            threaded=True,
+            use_reloader=False
+        )
+    else:
+        serve(app, host='0.0.0.0', port=8000, threads=8)
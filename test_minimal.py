@@ -1,7 +1,11 @@
 import json
+import socket
+import sys
 import requests
 import time
 
+from solver_client import SESSION
+
 # Create a minimal test case
 minimal_case = {
     "calendar": {
@@ -55,19 +59,29 @@ minimal_case = {
 print("Testing with minimal case...")
 print("Health check...")
 try:
-    health = requests.get("http://localhost:8000/health", timeout=5)
-    if health.ok:
-        print("[Done] Health check OK")
-    else:
-        print(f"[Error] Health check failed: {health.status_code}")
-        exit(1)
-except Exception as e:
+    socket.create_connection(("127.0.0.1", 8000), timeout=1).close()
+except OSError as e:
     print(f"[Error] Cannot connect: {e}")
-    exit(1)
+    sys.exit(1)
+
+print("[Done] Port 8000 is accepting connections")
+
+# The /health endpoint itself is only queried when asked for
+if "--verbose" in sys.argv:
+    try:
+        health = SESSION.get("http://localhost:8000/health", timeout=5)
+    except requests.RequestException as e:
+        print(f"[Error] Cannot connect: {e}")
+        sys.exit(1)
+    if not health.ok:
+        print(f"[Error] Health check failed: {health.status_code}")
+        sys.exit(1)
+    print("[Done] Health check OK")
+    print(json.dumps(health.json(), indent=2))
 
 print("Testing optimization...")
 try:
-    response = requests.post("http://localhost:8000/solve", 
+    response = SESSION.post("http://localhost:8000/solve", 
                            json=minimal_case, 
                            timeout=30)
     
@@ -6,6 +6,8 @@ Test script with realistic data to verify testcase_gui.py is being used
 import requests
 import json
 
+from solver_client import SESSION, encode_body
+
 def test_realistic_solver():
     """Test with realistic data to ensure testcase_gui.py is called"""
     
@@ -116,7 +118,8 @@ def test_realistic_solver():
         print()
         
         # Send request to local solver
-        response = requests.post("http://localhost:8000/solve", json=test_data, timeout=120)
+        response = SESSION.post("http://localhost:8000/solve", data=encode_body(test_data),
+                                headers={'Content-Type': 'application/json'}, timeout=120)
         
         if response.status_code == 200:
             print("[Done] Local solver responded successfully!")
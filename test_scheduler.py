@@ -2,16 +2,16 @@
 """
 Test the complete scheduler_sat.py implementation
 """
-import json
 import time
+
 from local_solver import solve_scheduling_case
+from solver_client import load_json
 
 def test_scheduler():
     print("Testing scheduler_sat.py implementation with case_oct.json...")
     
     # Load test data
-    with open('public/case_oct.json', 'r') as f:
-        case_data = json.load(f)
+    case_data = load_json('public/case_oct.json')
     
     print(f"Loaded case with {len(case_data.get('shifts', []))} shifts and {len(case_data.get('providers', []))} providers")
     
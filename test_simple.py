@@ -3,7 +3,8 @@
 Simple test to check if basic constraints work
 """
 import json
-import requests
+
+from solver_client import SESSION
 
 # Create a very simple test case with minimal constraints
 simple_case = {
@@ -66,7 +67,7 @@ print(f"Shifts: {len(simple_case['shifts'])}")
 print(f"Providers: {len(simple_case['providers'])}")
 
 try:
-    response = requests.post('http://localhost:8000/solve', json=simple_case, timeout=30)
+    response = SESSION.post('http://localhost:8000/solve', json=simple_case, timeout=30)
     if response.ok:
         result = response.json()
         print(f"[Done] Status: {result.get('status')}")
@@ -2,16 +2,15 @@
 """
 Test script to verify webapp local solver uses real scheduler_sat_core
 """
-import json
-import requests
 import time
 
+from solver_client import SESSION, decode_body, encode_body, load_json
+
 def test_webapp_solver():
     print("Testing webapp local solver...")
     
     # Load test case
-    with open('public/case_oct.json', 'r', encoding='utf-8') as f:
-        case_data = json.load(f)
+    case_data = load_json('public/case_oct.json')
     
     print(f"Loaded case: {len(case_data['shifts'])} shifts, {len(case_data['providers'])} providers")
     
@@ -22,16 +21,18 @@ def test_webapp_solver():
         **case_data,
         "run": {"k": 3, "time": 60}  # Short test
     }
+    # Serialize once, outside the request
+    body = encode_body(payload)
     
     print("Sending request to webapp local solver...")
     start_time = time.time()
     
     try:
-        response = requests.post(url, json=payload, timeout=120)
+        response = SESSION.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=120)
         execution_time = time.time() - start_time
         
         if response.status_code == 200:
-            result = response.json()
+            result = decode_body(response.content)
             print(f"\nSUCCESS! Response received in {execution_time:.2f}s")
             print(f"Status: {result.get('status')}")
             print(f"Solutions found: {len(result.get('results', {}).get('solutions', []))}")
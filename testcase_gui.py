@@ -17,28 +17,6 @@ Scheduler Testcase Builder GUI
 """
 from __future__ import annotations
 
-import json
-import os
-import sys
-import threading
-import subprocess
-import queue
-import random
-from pathlib import Path
-from datetime import date, timedelta, datetime
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, simpledialog
-
-import argparse, json, os, re, sys, subprocess, traceback
-import datetime as dt
-from collections import defaultdict
-from typing import Dict, Any, List
-
-import logging
-from logging import Logger
-
-from ortools.sat.python import cp_model
-from openpyxl import Workbook
 CHOSPITAL = ""
 SCALE = 1
 #!/usr/bin/env python3
@@ -60,11 +38,13 @@ Behavior is identical to the CLI version you shared:
 Deps:
   - colorama (optional for terminal colors)
   - openpyxl (only if reading .xlsx/.xlsm)
+  - python-calamine (optional; faster .xlsx/.xlsm reading, used when installed)
 """
 
-import json, csv, sys, collections, io
+import json, csv, sys, collections, io, itertools
+from functools import lru_cache
 from pathlib import Path
-from datetime import date, datetime
+from datetime import date
 
 # -------------- Colors --------------
 _USE_COLOR = True
@@ -86,30 +66,47 @@ def _c_dim(s):  return (Style.DIM + s + Style.RESET_ALL)  if _USE_COLOR else s
 
 _PREFERRED_ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
 
+try:
+    import orjson as _orjson  # optional: faster parsing of large case files
+except Exception:
+    _orjson = None
+
+_BOMS = ((b"\xef\xbb\xbf", "utf-8-sig"), (b"\xff\xfe", "utf-16"), (b"\xfe\xff", "utf-16"))
+
 def _read_text_best_effort(path: str):
+    # one read; a BOM settles the encoding, otherwise try the preferred list
+    data = Path(path).read_bytes()
+    for bom, enc in _BOMS:
+        if data.startswith(bom):
+            try:
+                return data.decode(enc), enc, False
+            except UnicodeDecodeError:
+                break
     for enc in _PREFERRED_ENCODINGS:
         try:
-            with open(path, "r", encoding=enc, newline="") as f:
-                return f.read(), enc, False
+            return data.decode(enc), enc, False
         except UnicodeDecodeError:
             continue
-    data = Path(path).read_bytes()
     txt = data.decode("latin-1", errors="replace")
     return txt, "latin-1-replace", True
 
 def _read_json_best_effort(path: str):
+    raw = Path(path).read_bytes()
+    if _orjson is not None:
+        # fast path for the common case: valid UTF-8 JSON
+        try:
+            return _orjson.loads(raw), "utf-8"
+        except _orjson.JSONDecodeError:
+            pass  # not UTF-8 or not JSON; the loop below sorts out which
     last_err = None
     for enc in _PREFERRED_ENCODINGS:
         try:
-            with open(path, "r", encoding=enc) as f:
-                return json.load(f), enc
+            text = raw.decode(enc)
         except UnicodeDecodeError as e:
             last_err = e
             continue
-        except json.JSONDecodeError:
-            raise
-    raw = Path(path).read_bytes().decode("latin-1", errors="replace")
-    return json.loads(raw), "latin-1-replace"
+        return json.loads(text), enc
+    return json.loads(raw.decode("latin-1", errors="replace")), "latin-1-replace"
 
 # -------------- Case loader --------------
 
@@ -157,84 +154,100 @@ def infer_schedule_from_json(obj):
                 out.setdefault(str(sid).strip(), []).append(str(prov).strip())
         return out
     if isinstance(obj, dict):
-        ok = True
-        for k in obj.keys():
+        # {shift_id: provider | [providers]}: one pass, bail on the first non-str key
+        out = {}
+        for k, v in obj.items():
             if not isinstance(k, str):
-                ok = False; break
-        if ok:
-            out = {}
-            for k, v in obj.items():
-                if isinstance(v, list):
-                    out[str(k).strip()] = [str(x).strip() for x in v if str(x).strip()]
-                elif isinstance(v, str):
-                    out[str(k).strip()] = [v.strip()]
-            if out:
-                return out
+                return None
+            if isinstance(v, list):
+                out[k.strip()] = [sx for sx in (str(x).strip() for x in v) if sx]
+            elif isinstance(v, str):
+                out[k.strip()] = [v.strip()]
+        if out:
+            return out
     return None
 
+_SHIFT_COLS = frozenset({"shiftid", "shift id", "id", "shift"})
+_PROV_COLS  = frozenset({"assignee", "provider", "provider_name", "name"})
+
 def _find_candidate_columns(header_lower):
-    def find_col(names):
-        for i, h in enumerate(header_lower):
-            if h in names:
-                return i
-        return None
-    c_shift = find_col({"shiftid", "shift id", "id", "shift"})
-    c_prov  = find_col({"assignee", "provider", "provider_name", "name"})
+    c_shift = next((i for i, h in enumerate(header_lower) if h in _SHIFT_COLS), None)
+    c_prov  = next((i for i, h in enumerate(header_lower) if h in _PROV_COLS), None)
     return c_shift, c_prov
 
+def _schedule_from_rows(rows):
+    """Header-sniff + ShiftID/Provider extraction for one sheet's rows (or None)."""
+    rows = iter(rows)
+    head = list(itertools.islice(rows, 10))
+    # sniff header
+    header = None
+    for row in head:
+        if not row: continue
+        nonempty = [c for c in row if c not in (None, "")]
+        if len(nonempty) < 2: continue
+        header = [str(c).strip() if c is not None else "" for c in row]
+        break
+    if not header:
+        return None
+    lower = [h.lower() for h in header]
+    c_shift, c_prov = _find_candidate_columns(lower)
+    if c_shift is None or c_prov is None:
+        return None
+
+    # read rows
+    sheet_map = {}
+    for row in itertools.chain(head[1:], rows):
+        if not row:
+            continue
+        sid = row[c_shift] if c_shift < len(row) else None
+        prov = row[c_prov] if c_prov < len(row) else None
+        if sid is None or str(sid).strip() == "":
+            continue
+        if prov is None or str(prov).strip() == "" or str(prov).strip().upper() == "UNFILLED":
+            continue
+        sid = str(sid).strip()
+        prov = str(prov).strip()
+        sheet_map.setdefault(sid, []).append(prov)
+    return sheet_map
+
+def _calamine_cell(c):
+    # calamine reports every number as float; openpyxl gives ints for whole numbers
+    return int(c) if isinstance(c, float) and c.is_integer() else c
+
 def _load_schedules_from_xlsx(path: str):
     """Return list of (sheet_name, schedule_map). One entry per suitable sheet."""
+    results = []
     try:
-        from openpyxl import load_workbook
+        # Rust-based reader; much faster than openpyxl on large sheets
+        from python_calamine import CalamineWorkbook
     except ImportError:
-        raise RuntimeError("openpyxl is required to read .xlsx/.xlsm files. Install via: pip install openpyxl")
-
-    wb = load_workbook(path, data_only=True, read_only=True)
-    results = []
-
-    for ws in wb.worksheets:
-        # sniff header
-        header = None
-        for row in ws.iter_rows(max_row=10, values_only=True):
-            if not row: continue
-            nonempty = [c for c in row if c not in (None, "")]
-            if len(nonempty) < 2: continue
-            header = [str(c).strip() if c is not None else "" for c in row]
-            break
-        if not header:
-            continue
-        lower = [h.lower() for h in header]
-        c_shift, c_prov = _find_candidate_columns(lower)
-        if c_shift is None or c_prov is None:
-            continue
+        CalamineWorkbook = None
+
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(path)
+        sheet_names = list(wb.sheet_names)
+        for name in sheet_names:
+            rows = ([_calamine_cell(c) for c in row] for row in wb.get_sheet_by_name(name).to_python())
+            sheet_map = _schedule_from_rows(rows)
+            if sheet_map:
+                results.append((name, sheet_map))
+    else:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("openpyxl is required to read .xlsx/.xlsm files. Install via: pip install openpyxl")
 
-        # read rows
-        first = True
-        sheet_map = {}
-        for row in ws.iter_rows(values_only=True):
-            if first:
-                first = False
-                continue
-            if not row:
-                continue
-            sid = row[c_shift] if c_shift < len(row) else None
-            prov = row[c_prov] if c_prov < len(row) else None
-            if sid is None or str(sid).strip() == "":
-                continue
-            if prov is None or str(prov).strip() == "" or str(prov).strip().upper() == "UNFILLED":
-                continue
-            sid = str(sid).strip()
-            prov = str(prov).strip()
-            sheet_map.setdefault(sid, []).append(prov)
-
-        if sheet_map:
-            results.append((ws.title, sheet_map))
+        wb = load_workbook(path, data_only=True, read_only=True)
+        sheet_names = [ws.title for ws in wb.worksheets]
+        for ws in wb.worksheets:
+            sheet_map = _schedule_from_rows(ws.iter_rows(values_only=True))
+            if sheet_map:
+                results.append((ws.title, sheet_map))
 
     if not results:
-        sheet_names = ", ".join(ws.title for ws in wb.worksheets)
         raise ValueError(
             f"No suitable worksheets in {path}. Need headers: ShiftID & Provider/Assignee. "
-            f"Sheets present: [{sheet_names}]"
+            f"Sheets present: [{', '.join(sheet_names)}]"
         )
     return results
 
@@ -247,24 +260,26 @@ def _load_schedule_from_csv(path: str):
         class _D(csv.excel):
             delimiter = ','
         dialect = _D()
-    try:
-        has_header = csv.Sniffer().has_header(sample)
-    except Exception:
-        has_header = True
-    fobj = io.StringIO(text)
-    reader = csv.DictReader(fobj, dialect=dialect) if has_header else csv.DictReader(fobj, fieldnames=None, dialect=dialect)
+    # The first row is the header either way (as with csv.DictReader); data
+    # rows are then read by column index, without building a dict per row
+    reader = csv.reader(io.StringIO(text), dialect=dialect)
+    fieldnames = next(reader, None)
     col_shift = col_provider = None
-    if reader.fieldnames:
-        lower = [c.lower() for c in reader.fieldnames]
+    if fieldnames:
+        lower = [c.lower() for c in fieldnames]
         c_shift, c_prov = _find_candidate_columns(lower)
-        if c_shift is not None: col_shift = reader.fieldnames[c_shift]
-        if c_prov  is not None: col_provider = reader.fieldnames[c_prov]
+        if c_shift is not None: col_shift = fieldnames[c_shift]
+        if c_prov  is not None: col_provider = fieldnames[c_prov]
     if not col_shift or not col_provider:
-        raise ValueError(f"CSV must include columns for shift and provider; got fields: {reader.fieldnames} (encoding={enc})")
+        raise ValueError(f"CSV must include columns for shift and provider; got fields: {fieldnames} (encoding={enc})")
+    # a repeated header name resolves to its last column, like a DictReader row dict
+    ci_shift = len(fieldnames) - 1 - fieldnames[::-1].index(col_shift)
+    ci_prov = len(fieldnames) - 1 - fieldnames[::-1].index(col_provider)
     out = {}
     for row in reader:
-        sid = (row.get(col_shift) or "").strip()
-        prov = (row.get(col_provider) or "").strip()
+        n = len(row)
+        sid = row[ci_shift].strip() if ci_shift < n else ""
+        prov = row[ci_prov].strip() if ci_prov < n else ""
         if sid and prov and prov.upper() != "UNFILLED":
             out.setdefault(sid, []).append(prov)
     return out, enc
@@ -293,21 +308,31 @@ def load_schedules(path_str: str):
 
 # -------------- Helpers --------------
 
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 def iso_weekday_name(dstr):
-    y,m,dd = map(int, dstr.split("-"))
-    return date(y,m,dd).strftime("%A")
+    # ordinal 1 (0001-01-01) was a Monday; the ordinal is parsed once per date string
+    return _WEEKDAY_NAMES[(_day_ordinal(dstr) - 1) % 7]
 
 def _to_date(dstr: str) -> date:
-    y,m,dd = map(int, dstr.split("-"))
-    return date(y,m,dd)
+    try:
+        return date.fromisoformat(dstr)  # C parser for the usual zero-padded form
+    except ValueError:
+        y,m,dd = map(int, dstr.split("-"))
+        return date(y,m,dd)
+
+@lru_cache(maxsize=None)
+def _day_ordinal(dstr: str) -> int:
+    # providers share the same calendar, so each date string is parsed once
+    return _to_date(dstr).toordinal()
 
 def _cluster_sizes(worked_days):
     if not worked_days:
         return []
-    dd = sorted(_to_date(d) for d in set(worked_days))
+    dd = sorted(map(_day_ordinal, set(worked_days)))
     sizes = []; run = 1
-    for i in range(1, len(dd)):
-        if (dd[i] - dd[i-1]).days == 1:
+    for prev, cur in zip(dd, dd[1:]):
+        if cur - prev == 1:
             run += 1
         else:
             sizes.append(run); run = 1
@@ -320,7 +345,6 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
     days = case["calendar_days"]
     shifts = case["shifts"]
     providers = case["providers"]
-    weekend_names = set(case["weekend_days"] or ["Saturday","Sunday"])
 
     if banner:
         print(_c_head(banner), file=stream)
@@ -335,7 +359,15 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
     shift_date = {sid: sh["date"] for sid, sh in shifts_by_id.items()}
     # FIXED: correct dict comprehension (remove bad/duplicate line)
     shift_type = {sid: sh.get("type","") for sid, sh in shifts_by_id.items()}
-    shift_allowed_types = {sid: set(sh.get("allowed_provider_types", ["MD"])) for sid, sh in shifts_by_id.items()}
+    # shifts repeat a handful of allowed-type combos; share one frozenset per combo
+    allowed_sets = {}
+    shift_allowed_types = {}
+    for sid, sh in shifts_by_id.items():
+        key = tuple(sh.get("allowed_provider_types", ["MD"]))
+        allowed = allowed_sets.get(key)
+        if allowed is None:
+            allowed = allowed_sets[key] = frozenset(key)
+        shift_allowed_types[sid] = allowed
 
     prov_day_to_shifts = collections.defaultdict(lambda: collections.defaultdict(list))
     for sid, provs in schedule_map.items():
@@ -350,9 +382,10 @@ def diagnose(case, schedule_map, stream=sys.stdout, preview_limit=8, banner=None
         checks.append((name, bool(ok), details))
 
     # 1) All shifts filled exactly once
+    # walk shifts in case order: the unfilled/overfilled previews list them that way
     unfilled, overfilled = [], []
     for sid in shifts_by_id:
-        n = len(schedule_map.get(sid, []))
+        n = len(schedule_map.get(sid, ()))
         if n == 0:
             unfilled.append(sid)
         elif n > 1:
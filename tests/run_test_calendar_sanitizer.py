@@ -1,12 +1,25 @@
 import importlib.util
+import sys
 from pathlib import Path
 
 
 def _load_advanced_solver():
+    name = 'fastapi_solver_service'
     svc_path = Path(__file__).resolve().parents[1] / 'public' / 'local-solver-package' / 'fastapi_solver_service.py'
-    spec = importlib.util.spec_from_file_location('fastapi_solver_service', str(svc_path))
+    # Reuse an already-loaded copy, but only if it is this file (the repo root
+    # has another fastapi_solver_service.py that may be importable by name)
+    mod = sys.modules.get(name)
+    if mod is not None and Path(getattr(mod, '__file__', '') or '').resolve() == svc_path:
+        return mod.AdvancedSchedulingSolver
+    spec = importlib.util.spec_from_file_location(name, str(svc_path))
     mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    # register before executing so imports of the service from inside it resolve to this module
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
     return mod.AdvancedSchedulingSolver
 
 
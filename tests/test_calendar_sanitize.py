@@ -1,4 +1,14 @@
 import calendar as pycalendar
+import re
+from functools import lru_cache
+
+# Mirrors the bridge: canonical YYYY-MM-DD entries skip the split/reformat path
+_CAL_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})', re.ASCII)
+
+
+@lru_cache(maxsize=None)
+def _month_last_day(y, m):
+    return pycalendar.monthrange(y, m)[1]
 
 
 def sanitize_calendar_like_bridge(calendar_obj):
@@ -17,6 +27,12 @@ def sanitize_calendar_like_bridge(calendar_obj):
     for idx, d in enumerate(days):
         if not isinstance(d, str):
             continue
+        canonical = _CAL_DATE_RE.fullmatch(d)
+        if canonical:
+            y, m, dd = int(canonical[1]), int(canonical[2]), int(canonical[3])
+            if y >= 1 and 1 <= m <= 12 and 1 <= dd <= _month_last_day(y, m):
+                cleaned.append(d)
+                continue
         parts = d.split('-')
         if len(parts) != 3:
             continue
@@ -27,10 +43,13 @@ def sanitize_calendar_like_bridge(calendar_obj):
         except Exception:
             continue
 
+        if y < 1 or y > 9999:
+            continue
+
         if m < 1 or m > 12:
             continue
 
-        last_day = pycalendar.monthrange(y, m)[1]
+        last_day = _month_last_day(y, m)
         if dd < 1:
             continue
         if dd > last_day:
@@ -0,0 +1,25 @@
+from datetime import date
+
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st  # noqa: E402
+
+from test_calendar_sanitize import sanitize_calendar_like_bridge  # noqa: E402
+
+iso_dates = st.dates().map(lambda d: d.isoformat())
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(iso_dates))
+def test_sanitize_keeps_valid_dates(xs):
+    assert sanitize_calendar_like_bridge({'days': xs})['days'] == xs
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.one_of(iso_dates, st.text(max_size=12))))
+def test_sanitize_always_yields_iso_dates(xs):
+    days = sanitize_calendar_like_bridge({'days': xs})['days']
+    assert isinstance(days, list)
+    for d in days:
+        assert date.fromisoformat(d).isoformat() == d